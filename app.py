@@ -1,11 +1,22 @@
 # app.py
 import os
-from datetime import datetime, timedelta
-from flask import Flask, jsonify, request
+import re
+import time
+import click
+from datetime import date, datetime, timedelta
+from flask import Flask, abort, jsonify, request
 from flask_migrate import Migrate
-from db import db
+from sqlalchemy.exc import IntegrityError
+from db import db, SQLITE_PRODUCTION_PRAGMAS, apply_sqlite_pragmas, configure_replica, engine_options, pin_to_primary
+from cache import ResponseCache, cached, cache_tags, invalidate
+from instrumentation import SQLProfiler
+from scoreboard import LiveScores
+from jobs import JobRunner
+import search  # registers the users_fts DDL with db.create_all()
+from serializers import init_json
+from export import export_cli
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__, instance_relative_config=True)
 
     # Ensure instance folder exists (for the SQLite file)
@@ -16,18 +27,162 @@ def create_app():
     app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+    # SQLite production profile (applied on every new connection).
+    # Override single keys from the environment, e.g. FLASK_SQLITE_PRAGMAS__synchronous=FULL
+    app.config["SQLITE_PRAGMAS"] = dict(SQLITE_PRODUCTION_PRAGMAS)
+
+    # Connection pool sizing (ignored for in-memory SQLite)
+    app.config["DB_POOL_SIZE"] = 5
+    app.config["DB_MAX_OVERFLOW"] = 10
+    app.config["DB_POOL_TIMEOUT"] = 30
+    app.config["DB_POOL_RECYCLE"] = 1800
+
+    # Optional read replica for GET/HEAD requests (see db.RoutingSession): a
+    # replica's URI, or a read-only pool on the SQLite file itself,
+    # sqlite:///file:/path/to/offthepost.db?mode=ro&uri=true (db.read_only_sqlite_uri)
+    app.config["SQLALCHEMY_REPLICA_URI"] = None
+
+    # Serve the user read endpoints from async views on an async engine (see asgi.py)
+    app.config["ASYNC_READS"] = False
+
     # MVP voting window (3 hours) – you can use this later in logic
     app.config["MVP_VOTING_WINDOW"] = timedelta(hours=3)
 
+    # Largest squad POST /sessions/<id>/auto_teams will balance
+    app.config["AUTO_TEAMS_MAX_PLAYERS"] = 60
+
+    # FLASK_* environment variables win over the defaults above, so
+    # FLASK_SQLALCHEMY_DATABASE_URI=postgresql+psycopg://... needs no code change
+    app.config.from_prefixed_env()
+    if config:
+        app.config.update(config)
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config))
+    configure_replica(app.config)
+
     db.init_app(app)
-    Migrate(app, db)
+    Migrate(app, db, include_name=search.include_name)
+
+    # jsonify through orjson when it is installed
+    init_json(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            apply_sqlite_pragmas(engine, app.config["SQLITE_PRAGMAS"])
+
+    # GET response cache; CACHE_BACKEND = "lru" (default), "redis" or "none"
+    ResponseCache(app)
+
+    # In-memory tally behind live scoreboards (reloaded after SCOREBOARD_TTL seconds)
+    LiveScores(app)
+
+    # Persistent job queue; JOB_WORKERS threads start with the first request (0 = use `flask run-jobs`)
+    JobRunner(app)
+
+    # Per-request SQL profiling (off unless SQL_PROFILING=True; sample with SQL_PROFILING_SAMPLE_RATE;
+    # /debug/metrics needs SQL_METRICS_TOKEN)
+    SQLProfiler(app)
 
     # Import models so Alembic can “see” them
     from models import (
         User, Group, GroupMembership,
         Session, SessionTeam, SessionTeamMembership,
-        Goal, MvpVote
+        Goal, MvpVote, UserStats, LeaderboardEntry
     )
+    import stats as user_stats
+    from stats import load_user_stats
+    from serializers import (
+        USER, GROUP, SESSION, SESSION_TEAM, GOAL, MVP_VOTE,
+        user_stats_needed, users_to_dicts
+    )
+    from pagination import keyset_page
+    from streaming import wants_stream, stream_query
+    from events import ingest_session_events, batch_error
+    import leaderboard
+    import chemistry
+    import team_balance
+    import mvp
+    import ratings
+    import rollups
+    import dashboard
+    import jobs
+    from scoreboard import finalize_session, session_scoreboard, add_live_goals, discard_live_scores
+
+    # flask export tables|match-facts, next to flask db
+    app.cli.add_command(export_cli)
+
+    @app.cli.command("rebuild-stats")
+    def rebuild_stats_command():
+        """Recompute the user_stats table from goals, votes and team memberships."""
+        n = user_stats.rebuild_user_stats()
+        app.extensions["response_cache"].clear()
+        print(f"✅ Rebuilt stats for {n} users")
+
+    @app.cli.command("rebuild-leaderboards")
+    def rebuild_leaderboards_command():
+        """Recompute every leaderboard from completed sessions."""
+        n = leaderboard.rebuild_leaderboards()
+        app.extensions["response_cache"].clear()
+        print(f"✅ Rebuilt {n} leaderboard entries")
+
+    @app.cli.command("rebuild-chemistry")
+    def rebuild_chemistry_command():
+        """Recompute every group's player pair counts from completed sessions."""
+        n = chemistry.rebuild_chemistry()
+        app.extensions["response_cache"].clear()
+        print(f"✅ Rebuilt {n} player pairs")
+
+    @app.cli.command("rebuild-ratings")
+    def rebuild_ratings_command():
+        """Replay every completed session to recompute player ratings and their history."""
+        n = ratings.rebuild_ratings()
+        app.extensions["response_cache"].clear()
+        print(f"✅ Rebuilt ratings for {n} players")
+
+    @app.cli.command("rebuild-rollups")
+    def rebuild_rollups_command():
+        """Recompute the day/week/month rollups from completed sessions."""
+        n = rollups.rebuild_rollups()
+        app.extensions["response_cache"].clear()
+        print(f"✅ Rebuilt {n} rollup rows")
+
+    @app.cli.command("finalize-mvp")
+    @click.option("--every", type=int, default=0, help="Keep running, checking every N seconds.")
+    def finalize_mvp_command(every):
+        """Write MVP winners for sessions whose voting window has closed (run from cron, or with --every)."""
+        while True:
+            n, won = mvp.finalize_due_sessions()
+            invalidate(*(f"user:{u_id}" for u_id in won))
+            print(f"✅ Finalized MVP voting for {n} sessions")
+            if not every:
+                return
+            time.sleep(every)
+
+    @app.cli.command("run-jobs")
+    @click.option("--threads", type=int, default=2, help="Worker threads in this process.")
+    @click.option("--once", is_flag=True, help="Run every due job, then exit.")
+    def run_jobs_command(threads, once):
+        """Run a dedicated job worker (set JOB_WORKERS=0 on the web app when using these)."""
+        if once:
+            worker_id = f"cli:{os.getpid()}"
+            n = 0
+            while jobs.run_one(worker_id):
+                n += 1
+            print(f"✅ Ran {n} jobs")
+            return
+        runner = app.extensions["job_runner"]
+        runner.start(threads)
+        print(f"👷 {threads} job workers running; Ctrl-C to stop")
+        try:
+            runner.join()
+        except KeyboardInterrupt:
+            runner.stop()
+
+    @app.cli.command("enqueue-job")
+    @click.argument("kind", type=click.Choice(sorted(jobs.HANDLERS)))
+    def enqueue_job_command(kind):
+        """Queue a payload-less job, e.g. rebuild_leaderboards."""
+        jobs.enqueue(kind, dedupe_key=kind)
+        db.session.commit()
+        print(f"✅ Queued {kind}")
 
     @app.route("/")
     def index():
@@ -35,37 +190,99 @@ def create_app():
 
     # --- User Routes ---
     @app.route("/users", methods=["GET"])
+    @cached("users")
     def get_users():
-        users = User.query.all()
-        return jsonify([{
-            "id": u.id,
-            "name": u.name,
-            "fav_team": u.fav_team,
-            "preferred_position": u.preferred_position,
-            "preferred_foot": u.preferred_foot,
-            "nickname": u.nickname,
-            "goals_scored": u.goals_scored_count,
-            "assists": u.assists_count,
-            "mvp_wins": u.mvp_wins_count,
-            "teams_played": [f"{t.name} ({t.session.group.name})" for t in u.teams_played]
-        } for u in users])
+        fields = USER.requested_fields()
+        users, next_cursor = keyset_page(USER.query(fields), User.id)
+        cache_tags(*(f"user:{u.id}" for u in users))
+        stats = load_user_stats((u.id for u in users), *user_stats_needed(fields))
+        return jsonify({"items": users_to_dicts(users, fields, stats), "next_cursor": next_cursor})
+
+    @app.route("/users/search", methods=["GET"])
+    @cached("users")
+    def search_users():
+        q = request.args.get("q", "")
+        fields = USER.requested_fields(default=search.SEARCH_RESULT_FIELDS)
+        limit = min(max(request.args.get("limit", 20, type=int), 1), 100)
+        offset = max(request.args.get("offset", 0, type=int), 0)
+        query = search.search_users(USER.query(fields), q)
+        if query is None:
+            abort(400, description="'q' must contain at least one letter or digit")
+        users = query.offset(offset).limit(limit + 1).all()
+        next_offset = offset + limit if len(users) > limit else None
+        users = users[:limit]
+        cache_tags(*(f"user:{u.id}" for u in users))
+        stats = load_user_stats((u.id for u in users), *user_stats_needed(fields))
+        return jsonify({"query": q, "items": users_to_dicts(users, fields, stats), "next_offset": next_offset})
 
     @app.route("/users/<int:user_id>", methods=["GET"])
+    @cached("user:{user_id}")
     def get_user(user_id):
-        user = User.query.get_or_404(user_id)
+        fields = USER.requested_fields()
+        user = USER.query(fields).filter(User.id == user_id).first()
+        if user is None:
+            abort(404)
+        stats = load_user_stats([user_id], *user_stats_needed(fields))
+        return jsonify(users_to_dicts([user], fields, stats)[0])
+
+    @app.route("/users/<int:user_id>/chemistry", methods=["GET"])
+    @cached("chemistry:{user_id}")
+    def get_user_chemistry(user_id):
+        User.query.get_or_404(user_id)
+        metric = request.args.get("metric", "together")
+        if metric not in chemistry.METRICS:
+            abort(400, description=f"'metric' must be one of: {', '.join(chemistry.METRICS)}")
+        group_id = request.args.get("group_id", type=int)
+        limit = min(max(request.args.get("limit", 10, type=int), 1), 100)
+        min_games = request.args.get("min_games", 1, type=int)
+        return jsonify({
+            "user_id": user_id,
+            "group_id": group_id,
+            "metric": metric,
+            "items": chemistry.read_chemistry(user_id, group_id, metric, limit, min_games),
+        })
+
+    @app.route("/users/<int:user_id>/rating", methods=["GET"])
+    @cached("rating:{user_id}")
+    def get_user_rating(user_id):
+        User.query.get_or_404(user_id)
+        limit = min(max(request.args.get("limit", 20, type=int), 0), 500)
+        return jsonify(ratings.user_rating(user_id, limit))
+
+    def timeline_response(entity, entity_id):
+        bucket = request.args.get("bucket", "week")
+        if bucket not in rollups.BUCKETS:
+            abort(400, description=f"'bucket' must be one of: {', '.join(rollups.BUCKETS)}")
+        try:
+            end = date.fromisoformat(request.args["to"]) if "to" in request.args else datetime.utcnow().date()
+            start = date.fromisoformat(request.args["from"]) if "from" in request.args else end - rollups.DEFAULT_SPAN[bucket]
+        except ValueError:
+            abort(400, description="'from' and 'to' must be dates (YYYY-MM-DD)")
+        except OverflowError:
+            abort(400, description="'to' is too early for the default span; pass 'from'")
+        if start > end:
+            abort(400, description="'from' must not be after 'to'")
+        if rollups.count_points(start, end, bucket) > rollups.MAX_POINTS:
+            abort(400, description=f"at most {rollups.MAX_POINTS} {bucket}s per request")
+        try:
+            items = rollups.read_timeline(entity, entity_id, bucket, start, end)
+        except OverflowError:
+            # The bucket after 'to' is past date.max
+            abort(400, description=f"'to' must be before the last {bucket} of year 9999")
         return jsonify({
-            "id": user.id,
-            "name": user.name,
-            "fav_team": user.fav_team,
-            "preferred_position": user.preferred_position,
-            "preferred_foot": user.preferred_foot,
-            "nickname": user.nickname,
-            "goals_scored": user.goals_scored_count,
-            "assists": user.assists_count,
-            "mvp_wins": user.mvp_wins_count,
-            "teams_played": [f"{t.name} ({t.session.group.name})" for t in user.teams_played]
+            entity + "_id": entity_id,
+            "bucket": bucket,
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "items": items,
         })
 
+    @app.route("/users/<int:user_id>/timeline", methods=["GET"])
+    @cached("user-timeline:{user_id}")
+    def get_user_timeline(user_id):
+        User.query.get_or_404(user_id)
+        return timeline_response("user", user_id)
+
     @app.route("/users", methods=["POST"])
     def create_user():
         data = request.get_json()
@@ -78,17 +295,65 @@ def create_app():
         )
         db.session.add(user)
         db.session.commit()
+        invalidate("users")
         return jsonify({"id": user.id, "message": "User created"}), 201
 
     # --- Group Routes ---
+    def leaderboard_response(group_id):
+        metric = request.args.get("metric", "goals")
+        if metric not in leaderboard.METRICS:
+            abort(400, description=f"'metric' must be one of: {', '.join(leaderboard.METRICS)}")
+        period = request.args.get("period", "all")
+        if not re.fullmatch(r"all|\d{4}|\d{4}-\d{2}", period):
+            abort(400, description="'period' must be 'all', a season (YYYY) or a month (YYYY-MM)")
+        limit = min(max(request.args.get("limit", 20, type=int), 1), 100)
+        offset = request.args.get("offset", 0, type=int)
+        if offset < 0:
+            abort(400, description="'offset' must not be negative")
+        min_games = request.args.get("min_games", 1, type=int)
+        return jsonify({
+            "metric": metric,
+            "period": period,
+            "items": leaderboard.read_leaderboard(group_id, metric, period, limit, offset, min_games),
+        })
+
+    @app.route("/leaderboard", methods=["GET"])
+    @cached("leaderboard")
+    def get_global_leaderboard():
+        return leaderboard_response(leaderboard.GLOBAL_SCOPE)
+
+    @app.route("/groups/<int:group_id>/leaderboard", methods=["GET"])
+    @cached("leaderboard:{group_id}")
+    def get_group_leaderboard(group_id):
+        Group.query.get_or_404(group_id)
+        return leaderboard_response(group_id)
+
+    @app.route("/groups/<int:group_id>/timeline", methods=["GET"])
+    @cached("group-timeline:{group_id}")
+    def get_group_timeline(group_id):
+        Group.query.get_or_404(group_id)
+        return timeline_response("group", group_id)
+
+    @app.route("/groups/<int:group_id>/dashboard", methods=["GET"])
+    @cached("dashboard:{group_id}", "groups", "sessions", "session_teams", "goals", "leaderboard:{group_id}")
+    def get_group_dashboard(group_id):
+        """Group, leader, members, recent sessions with teams and scores, and top scorers in one response."""
+        members = min(max(request.args.get("members", 50, type=int), 1), dashboard.MAX_MEMBERS)
+        sessions = min(max(request.args.get("sessions", 5, type=int), 0), dashboard.MAX_SESSIONS)
+        top = min(max(request.args.get("top", 5, type=int), 0), dashboard.MAX_TOP_PLAYERS)
+        data = dashboard.group_dashboard(group_id, members, sessions, top)
+        if data is None:
+            abort(404)
+        # Completion and MVP results are invalidated per session
+        cache_tags(*(f"session:{s['id']}" for s in data["recent_sessions"]))
+        return jsonify(data)
+
     @app.route("/groups", methods=["GET"])
+    @cached("groups")
     def get_groups():
-        groups = Group.query.all()
-        return jsonify([{
-            "id": g.id,
-            "name": g.name,
-            "leader": g.leader.name if g.leader else None
-        } for g in groups])
+        fields = GROUP.requested_fields()
+        groups, next_cursor = keyset_page(GROUP.query(fields), Group.id)
+        return jsonify({"items": [GROUP.to_dict(g, fields) for g in groups], "next_cursor": next_cursor})
 
     @app.route("/groups", methods=["POST"])
     def create_group():
@@ -96,19 +361,17 @@ def create_app():
         group = Group(name=data["name"])
         db.session.add(group)
         db.session.commit()
+        invalidate("groups")
         return jsonify({"id": group.id, "message": "Group created"}), 201
 
     # --- Session Routes ---
     @app.route("/sessions", methods=["GET"])
+    @cached("sessions")
     def get_sessions():
-        sessions = Session.query.all()
-        return jsonify([{
-            "id": s.id,
-            "group": s.group.name,
-            "location": s.location,
-            "start_time": s.start_time.isoformat(),
-            "completed_at": s.completed_at.isoformat() if s.completed_at else None
-        } for s in sessions])
+        fields = SESSION.requested_fields()
+        sessions, next_cursor = keyset_page(SESSION.query(fields), Session.id)
+        cache_tags(*(f"session:{s.id}" for s in sessions))
+        return jsonify({"items": [SESSION.to_dict(s, fields) for s in sessions], "next_cursor": next_cursor})
 
     @app.route("/sessions", methods=["POST"])
     def create_session():
@@ -120,13 +383,104 @@ def create_app():
         )
         db.session.add(session)
         db.session.commit()
+        invalidate("sessions")
         return jsonify({"id": session.id, "message": "Session created"}), 201
 
+    @app.route("/sessions/<int:session_id>/complete", methods=["POST"])
+    def complete_session(session_id):
+        session = Session.query.get_or_404(session_id)
+        if session.completed_at is not None:
+            return jsonify({"error": "Session already completed"}), 409
+        session.completed_at = datetime.utcnow()
+        db.session.flush()
+        scoreboard = finalize_session(session)
+        # Leaderboards and chemistry catch up in the background; at most one refresh per session
+        jobs.enqueue("apply_completed_session", {"session_id": session.id}, dedupe_key=f"session-complete:{session.id}")
+        # Ratings must follow completion order, so one job rates whatever is pending
+        jobs.enqueue("rate_sessions", dedupe_key="rate_sessions")
+        db.session.commit()
+        discard_live_scores(session.id)
+        invalidate(f"session:{session.id}")
+        return jsonify({
+            "id": session.id,
+            "completed_at": session.completed_at.isoformat(),
+            "scoreboard": scoreboard,
+            "message": "Session completed"
+        })
+
+    @app.route("/sessions/<int:session_id>/auto_teams", methods=["POST"])
+    def create_auto_teams(session_id):
+        """Split the attending players into balanced teams (dry_run: just propose them)."""
+        session = Session.query.get_or_404(session_id)
+        data = request.get_json()
+        players = data.get("players") or []
+        n_teams = data.get("teams", 2)
+        names = data.get("names")
+        max_players = app.config["AUTO_TEAMS_MAX_PLAYERS"]
+        if not all(isinstance(u, int) for u in players) or len(set(players)) != len(players):
+            abort(400, description="'players' must be a list of distinct user ids")
+        if not isinstance(n_teams, int) or not 2 <= n_teams <= len(players):
+            abort(400, description="'teams' must be at least 2 and at most the number of players")
+        if len(players) > max_players:
+            abort(400, description=f"at most {max_players} players")
+        if names is not None and (not all(isinstance(n, str) and n for n in names) or len(set(names)) != n_teams):
+            abort(400, description="'names' must give one distinct name per team")
+        if session.completed_at is not None:
+            return jsonify({"error": "Session already completed"}), 409
+        if not data.get("dry_run") and session.teams:
+            return jsonify({"error": "Session already has teams"}), 409
+        try:
+            teams = team_balance.auto_teams(session, players, n_teams, names, create=not data.get("dry_run"))
+        except LookupError as e:
+            abort(400, description=str(e))
+        if data.get("dry_run"):
+            return jsonify({"session_id": session.id, "teams": teams})
+        db.session.commit()
+        discard_live_scores(session.id)
+        invalidate("session_teams", *(f"user:{u_id}" for u_id in players))
+        return jsonify({"session_id": session.id, "teams": teams, "message": "Teams created"}), 201
+
+    @app.route("/sessions/<int:session_id>/scoreboard", methods=["GET"])
+    def get_session_scoreboard(session_id):
+        session = Session.query.get_or_404(session_id)
+        return jsonify(session_scoreboard(session))
+
+    @app.route("/sessions/<int:session_id>/events", methods=["POST"])
+    def create_session_events(session_id):
+        session = Session.query.get_or_404(session_id)
+        data = request.get_json(silent=True)
+        error = batch_error(data)
+        if error:
+            abort(400, description=error)
+        if session.completed_at is not None and (data.get("goals") or data.get("roster")):
+            # Completion has been applied everywhere; only MVP votes may still arrive
+            return jsonify({"error": "Session already completed; only votes are accepted"}), 409
+        inserted, errors, touched_users = ingest_session_events(session, data)
+        if not any(inserted.values()) and errors:
+            db.session.rollback()
+            return jsonify({"inserted": inserted, "errors": errors}), 400
+        db.session.commit()
+        if inserted["goals"]:
+            # Which goals were valid is only known inside the batch; reload the tally
+            discard_live_scores(session.id)
+        invalidate(
+            "session_teams" if inserted["roster"] else None,
+            "goals" if inserted["goals"] else None,
+            "mvp_votes" if inserted["votes"] else None,
+            *(f"user:{u_id}" for u_id in touched_users),
+        )
+        if inserted["votes"]:
+            invalidate("leaderboard", f"leaderboard:{session.group_id}", f"group-timeline:{session.group_id}",
+                       *(f"user-timeline:{u_id}" for u_id in touched_users))
+        return jsonify({"inserted": inserted, "errors": errors, "message": "Events recorded"}), 201
+
     # --- Session Team Routes ---
     @app.route("/session_teams", methods=["GET"])
+    @cached("session_teams")
     def get_session_teams():
-        teams = SessionTeam.query.all()
-        return jsonify([{"id": t.id, "session_id": t.session_id, "name": t.name, "captain_id": t.captain_id} for t in teams])
+        fields = SESSION_TEAM.requested_fields()
+        teams, next_cursor = keyset_page(SESSION_TEAM.query(fields), SessionTeam.id)
+        return jsonify({"items": [SESSION_TEAM.to_dict(t, fields) for t in teams], "next_cursor": next_cursor})
 
     @app.route("/session_teams", methods=["POST"])
     def create_session_team():
@@ -138,59 +492,125 @@ def create_app():
         )
         db.session.add(team)
         db.session.commit()
+        discard_live_scores(team.session_id)
+        invalidate("session_teams")
         return jsonify({"id": team.id, "message": "Team created"}), 201
 
+    @app.route("/session_teams/<int:team_id>/members", methods=["POST"])
+    def add_session_team_member(team_id):
+        team = SessionTeam.query.get_or_404(team_id)
+        if team.session.completed_at is not None:
+            return jsonify({"error": "Session already completed"}), 409
+        data = request.get_json()
+        membership = SessionTeamMembership(session_team_id=team.id, user_id=data["user_id"])
+        db.session.add(membership)
+        db.session.flush()
+        user_stats.record_team_membership(membership)
+        db.session.commit()
+        # Rosters are shown by the group dashboard
+        invalidate(f"user:{membership.user_id}", "session_teams", f"session:{team.session_id}")
+        return jsonify({"id": membership.id, "message": "Player added to team"}), 201
+
     # --- Goal Routes ---
     @app.route("/goals", methods=["GET"])
+    @cached("goals")
     def get_goals():
-        goals = Goal.query.all()
-        return jsonify([{
-            "id": g.id,
-            "session_id": g.session_id,
-            "team_id": g.team_id,
-            "scorer_id": g.scorer_id,
-            "assist_id": g.assist_id,
-            "minute": g.minute
-        } for g in goals])
+        fields = GOAL.requested_fields()
+        fmt = wants_stream()
+        if fmt:
+            return stream_query(GOAL.query(fields), Goal.id, lambda g: GOAL.to_dict(g, fields), fmt)
+        goals, next_cursor = keyset_page(GOAL.query(fields), Goal.id)
+        return jsonify({"items": [GOAL.to_dict(g, fields) for g in goals], "next_cursor": next_cursor})
 
     @app.route("/goals", methods=["POST"])
     def create_goal():
         data = request.get_json()
+        session = Session.query.get_or_404(data["session_id"])
+        if session.completed_at is not None:
+            # The final score is stored on completion; a late goal would not be counted in it
+            return jsonify({"error": "Session already completed"}), 409
+        team = db.session.get(SessionTeam, data["team_id"])
+        if team is None or team.session_id != session.id:
+            abort(400, description=f"team {data['team_id']} is not in session {session.id}")
         goal = Goal(
-            session_id=data["session_id"],
+            session_id=session.id,
             team_id=data["team_id"],
             scorer_id=data["scorer_id"],
             assist_id=data.get("assist_id"),
             minute=data.get("minute")
         )
         db.session.add(goal)
+        user_stats.record_goal(goal)
         db.session.commit()
+        add_live_goals(goal.session_id, {goal.team_id: 1})
+        invalidate("goals", f"user:{goal.scorer_id}", f"user:{goal.assist_id}" if goal.assist_id else None)
         return jsonify({"id": goal.id, "message": "Goal logged"}), 201
 
     # --- MVP Vote Routes ---
     @app.route("/mvp_votes", methods=["GET"])
+    @cached("mvp_votes")
     def get_mvp_votes():
-        votes = MvpVote.query.all()
-        return jsonify([{
-            "id": v.id,
-            "session_id": v.session_id,
-            "voter_id": v.voter_id,
-            "voted_for_id": v.voted_for_id,
-            "created_at": v.created_at.isoformat()
-        } for v in votes])
+        fields = MVP_VOTE.requested_fields()
+        fmt = wants_stream()
+        if fmt:
+            return stream_query(MVP_VOTE.query(fields), MvpVote.id, lambda v: MVP_VOTE.to_dict(v, fields), fmt)
+        votes, next_cursor = keyset_page(MVP_VOTE.query(fields), MvpVote.id)
+        return jsonify({"items": [MVP_VOTE.to_dict(v, fields) for v in votes], "next_cursor": next_cursor})
 
     @app.route("/mvp_votes", methods=["POST"])
     def create_mvp_vote():
         data = request.get_json()
+        session = Session.query.get_or_404(data["session_id"])
+        error = mvp.window_error(session)
+        if error:
+            return jsonify({"error": error}), 409
+        if data["voter_id"] == data["voted_for_id"]:
+            abort(400, description="cannot vote for yourself")
+        error = mvp.eligibility_error(data["voter_id"], data["voted_for_id"], mvp.session_players(session.id))
+        if error:
+            return jsonify({"error": error}), 403
+        if mvp.has_voted(session.id, data["voter_id"]):
+            return jsonify({"error": "voter already voted in this session"}), 409
         vote = MvpVote(
-            session_id=data["session_id"],
+            session_id=session.id,
             voter_id=data["voter_id"],
             voted_for_id=data["voted_for_id"]
         )
-        db.session.add(vote)
-        db.session.commit()
+        try:
+            # The insert may flush before the commit, so both sit under the
+            # try; a concurrent vote that passed has_voted too loses here
+            db.session.add(vote)
+            user_stats.record_mvp_vote(vote)
+            mvp.add_to_tally(session.id, {vote.voted_for_id: 1})
+            leaderboard.apply_mvp_votes(session, {vote.voted_for_id: 1})
+            rollups.apply_mvp_votes(session, {vote.voted_for_id: 1})
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({"error": "voter already voted in this session"}), 409
+        invalidate("mvp_votes", f"user:{vote.voted_for_id}", "leaderboard", f"leaderboard:{session.group_id}",
+                   f"user-timeline:{vote.voted_for_id}", f"group-timeline:{session.group_id}")
         return jsonify({"id": vote.id, "message": "Vote cast"}), 201
 
+    @app.route("/sessions/<int:session_id>/mvp", methods=["GET"])
+    def get_session_mvp(session_id):
+        session = Session.query.get_or_404(session_id)
+        if mvp.voting_status(session) == "closed":
+            # Decide on the primary: a lagging replica may not have seen the finalization yet
+            pin_to_primary()
+            db.session.refresh(session)
+        if mvp.voting_status(session) == "closed":
+            # The scheduler has not got to this one yet; finalize it now
+            won = mvp.finalize_sessions([session])
+            db.session.commit()
+            invalidate(*(f"user:{u_id}" for u_id in won))
+        limit = min(max(request.args.get("limit", 10, type=int), 1), 100)
+        return jsonify(mvp.mvp_summary(session, limit))
+
+    if app.config["ASYNC_READS"]:
+        from async_reads import register_async_reads
+        register_async_reads(app)
+
     return app
 
 if __name__ == "__main__":
@@ -0,0 +1,17 @@
+# asgi.py
+"""ASGI entry point with the async read path switched on.
+
+    uvicorn asgi:app --workers 4
+
+This wraps the WSGI app, so it does not make the server natively
+concurrent: WsgiToAsgi runs each request on a worker thread, and Flask
+runs each async view on a fresh event loop in that thread. Requests in
+flight per process are bounded by the thread pool, as under a threaded
+WSGI server. What the async path adds is concurrency inside a request:
+a view's independent queries run in parallel (see async_reads.py).
+Scale the number of requests with --workers (processes).
+"""
+from asgiref.wsgi import WsgiToAsgi
+from app import create_app
+
+app = WsgiToAsgi(create_app({"ASYNC_READS": True}))
@@ -0,0 +1,104 @@
+# async_reads.py
+import asyncio
+from flask import abort, current_app, jsonify
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from db import apply_sqlite_pragmas
+from models import User
+from pagination import page_args, trim_page
+from serializers import USER, user_stats_needed, users_to_dicts
+from stats import empty_user_stats, counters_select, team_labels_select, merge_user_stats
+from cache import cached, cache_tags
+
+# Async driver for each sync backend
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_url(sync_url):
+    url = make_url(sync_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r}; set ASYNC_DATABASE_URI")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+class AsyncDB:
+    """Async engine for the read path (ASYNC_READS=True).
+
+    Flask runs every async view on its own short-lived event loop, so
+    connections are not pooled across requests (NullPool). Each concurrent
+    query gets its own connection, so on SQLite in WAL mode the reads
+    really do run in parallel.
+    """
+
+    def __init__(self, app=None):
+        self.engine = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Reads only, so the replica when there is one
+        sync_url = app.config.get("SQLALCHEMY_REPLICA_URI") or app.config["SQLALCHEMY_DATABASE_URI"]
+        url = app.config.get("ASYNC_DATABASE_URI") or async_database_url(sync_url)
+        self.engine = create_async_engine(url, poolclass=NullPool)
+        apply_sqlite_pragmas(self.engine.sync_engine, app.config["SQLITE_PRAGMAS"])
+        app.extensions["async_db"] = self
+
+    async def fetch(self, stmt):
+        async with self.engine.connect() as conn:
+            return (await conn.execute(stmt)).all()
+
+
+def _adb():
+    return current_app.extensions["async_db"]
+
+
+async def _none():
+    return ()
+
+
+async def load_user_stats_async(user_ids, counters=True, teams=True):
+    """Same result as stats.load_user_stats, with both queries in flight at once."""
+    stats = empty_user_stats(user_ids)
+    if not user_ids:
+        return stats
+    counter_rows, team_rows = await asyncio.gather(
+        _adb().fetch(counters_select(user_ids)) if counters else _none(),
+        _adb().fetch(team_labels_select(user_ids)) if teams else _none(),
+    )
+    return merge_user_stats(stats, counter_rows, team_rows)
+
+
+async def get_users():
+    fields = USER.requested_fields()
+    limit, cursor = page_args()
+    stmt = USER.select(fields).order_by(User.id).limit(limit + 1)
+    if cursor is not None:
+        stmt = stmt.where(User.id > cursor)
+    users, next_cursor = trim_page(await _adb().fetch(stmt), limit)
+    cache_tags(*(f"user:{u.id}" for u in users))
+    stats = await load_user_stats_async([u.id for u in users], *user_stats_needed(fields))
+    return jsonify({"items": users_to_dicts(users, fields, stats), "next_cursor": next_cursor})
+
+
+async def get_user(user_id):
+    fields = USER.requested_fields()
+    counters, teams = user_stats_needed(fields)
+    # The profile row, its counters and its teams are independent: fetch them together
+    user_rows, counter_rows, team_rows = await asyncio.gather(
+        _adb().fetch(USER.select(fields).where(User.id == user_id)),
+        _adb().fetch(counters_select([user_id])) if counters else _none(),
+        _adb().fetch(team_labels_select([user_id])) if teams else _none(),
+    )
+    if not user_rows:
+        abort(404)
+    stats = merge_user_stats(empty_user_stats([user_id]), counter_rows, team_rows)
+    return jsonify(users_to_dicts(user_rows, fields, stats)[0])
+
+
+def register_async_reads(app):
+    """Swap the user read endpoints for their async versions (same URLs, same payloads)."""
+    AsyncDB(app)
+    app.view_functions["get_users"] = cached("users")(get_users)
+    app.view_functions["get_user"] = cached("user:{user_id}")(get_user)
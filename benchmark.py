@@ -0,0 +1,320 @@
+# benchmark.py
+"""Endpoint benchmarks with latency / query-count regression gates.
+
+    python benchmark.py --sizes small,medium --save benchmark_baseline.json
+    python benchmark.py --sizes small,medium --compare benchmark_baseline.json
+
+For each size a fresh SQLite file is filled by seed.generate. Every route in
+create_app is then driven through the Flask test client, and the GET routes
+are also hit by a multi-threaded load generator. Per route the run records
+p50/p95/p99 latency, throughput and SQL statements per request. With
+--compare it exits non-zero when a route runs more queries than the
+baseline, or its p95 grows past --max-slowdown.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import create_app, db
+from db import read_only_sqlite_uri
+from models import User, Session, SessionTeam, SessionTeamMembership
+import seed
+
+SIZES = {
+    "small": {"users": 200, "groups": 10, "sessions_per_group": 10},
+    "medium": {"users": 5000, "groups": 200, "sessions_per_group": 50},
+    "large": {"users": 100000, "groups": 2000, "sessions_per_group": 100},
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark every OffThePost route.")
+    parser.add_argument("--sizes", default="small", help=f"comma-separated, from: {', '.join(SIZES)}")
+    parser.add_argument("--requests", type=int, default=50, help="timed requests per route")
+    parser.add_argument("--workers", type=int, default=4, help="load generator threads")
+    parser.add_argument("--duration", type=float, default=5.0, help="load test seconds per size")
+    parser.add_argument("--cache", action="store_true", help="keep the response cache on")
+    parser.add_argument("--replica", action="store_true", help="serve GETs from a read-only pool on the same file")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON to gate against")
+    parser.add_argument("--max-slowdown", type=float, default=0.25, help="allowed p95 growth (0.25 = +25%%)")
+    parser.add_argument("--min-slowdown-ms", type=float, default=2.0, help="ignore p95 growth below this")
+    return parser.parse_args()
+
+
+def percentile(samples, p):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = (len(ordered) - 1) * p / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(latencies, queries=None, elapsed=None):
+    result = {
+        "requests": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "rps": round(len(latencies) / (elapsed if elapsed is not None else sum(latencies)), 1) if latencies else 0.0,
+    }
+    if queries is not None:
+        result["queries"] = max(queries, default=0)
+    return result
+
+
+class QueryCounter:
+    """Counts SQL statements per thread."""
+
+    def __init__(self, engines):
+        self.local = threading.local()
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.local.n = getattr(self.local, "n", 0) + 1
+
+    def reset(self):
+        self.local.n = 0
+
+    @property
+    def n(self):
+        return getattr(self.local, "n", 0)
+
+
+def build_app(size, cache, replica=False):
+    params = SIZES[size]
+    path = os.path.join(tempfile.mkdtemp(prefix="otp-bench-"), f"{size}.db")
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "SQLALCHEMY_REPLICA_URI": read_only_sqlite_uri(f"sqlite:///{path}") if replica else None,
+        "CACHE_BACKEND": "lru" if cache else "none",
+        # Deferred jobs stay queued, so background work does not skew the timings
+        "JOB_WORKERS": 0,
+    })
+    with app.app_context():
+        db.create_all()
+        args = argparse.Namespace(members_per_group=12, players_per_team=5, seed=42, chunk_size=20000, **params)
+        seed.generate(args)
+        db.session.commit()
+        seed.rebuild_mvp()
+        seed.rebuild_user_stats()
+        seed.rebuild_leaderboards()
+        seed.rebuild_chemistry()
+        seed.rebuild_ratings()
+        seed.rebuild_rollups()
+    return app
+
+
+def route_scenarios(n):
+    """(route rule, method, setup) — setup runs untimed and returns one (url, json) per request."""
+
+    def open_session():
+        return Session.query.filter(Session.completed_at.is_(None)).order_by(Session.id).first()
+
+    def fresh_session(teams=2):
+        s = Session(group_id=1, location="Bench", start_time=datetime(2025, 1, 1) + timedelta(minutes=random.random()))
+        db.session.add(s)
+        db.session.flush()
+        created = [SessionTeam(session_id=s.id, name=f"Bench {i}") for i in range(teams)]
+        db.session.add_all(created)
+        db.session.flush()
+        return s, created
+
+    def user_ids():
+        # At least 11: the events batch uses ten scorer/assist pairs
+        return [u_id for (u_id,) in db.session.query(User.id).order_by(User.id).limit(max(n, 10) + 1)]
+
+    def complete_requests():
+        out = []
+        for _ in range(n):
+            s, teams = fresh_session()
+            ids = user_ids()[:10]
+            db.session.add_all(SessionTeamMembership(session_team_id=teams[i % 2].id, user_id=u) for i, u in enumerate(ids))
+            out.append((f"/sessions/{s.id}/complete", None))
+        db.session.commit()
+        return out
+
+    def auto_teams_requests():
+        # Match-day squads: 24 players into 2 teams, each request on a session with no teams yet
+        squad = [u_id for (u_id,) in db.session.query(User.id).order_by(User.id).limit(24)]
+        sessions = [fresh_session(teams=0)[0] for _ in range(n)]
+        db.session.commit()
+        return [(f"/sessions/{s.id}/auto_teams", {"players": squad, "teams": 2}) for s in sessions]
+
+    def members_requests():
+        _, (team, _) = fresh_session()
+        db.session.commit()
+        return [(f"/session_teams/{team.id}/members", {"user_id": u}) for u in user_ids()[:n]]
+
+    def voting_session():
+        s, (team, _) = fresh_session()
+        s.completed_at = datetime.utcnow()
+        db.session.add_all(SessionTeamMembership(session_team_id=team.id, user_id=u) for u in user_ids())
+        db.session.commit()
+        return s
+
+    def vote_requests():
+        s = voting_session()
+        ids = user_ids()
+        return [("/mvp_votes", {"session_id": s.id, "voter_id": ids[i], "voted_for_id": ids[i + 1]}) for i in range(n)]
+
+    def goal_requests():
+        s = open_session()
+        team = s.teams[0]
+        ids = user_ids()
+        return [("/goals", {"session_id": s.id, "team_id": team.id, "scorer_id": ids[i % len(ids)]}) for i in range(n)]
+
+    def events_requests():
+        s = open_session()
+        team = s.teams[0]
+        ids = user_ids()
+        body = {"goals": [{"team_id": team.id, "scorer_id": ids[i], "assist_id": ids[i + 1]} for i in range(10)]}
+        return [(f"/sessions/{s.id}/events", body)] * n
+
+    tag = int(time.time() * 1000)
+    return [
+        ("/", "GET", lambda: [("/", None)] * n),
+        ("/users", "GET", lambda: [("/users?limit=100", None)] * n),
+        ("/users/search", "GET", lambda: [(f"/users/search?q={q}", None) for q in ("kh", "ars", "mo 1")] * max(1, n // 3)),
+        ("/users/<int:user_id>", "GET", lambda: [(f"/users/{u}", None) for u in user_ids()[:n]]),
+        ("/users/<int:user_id>/timeline", "GET",
+         lambda: [(f"/users/{u}/timeline?from=2024-01-01&to=2025-12-31&bucket=month", None) for u in user_ids()[:n]]),
+        ("/users/<int:user_id>/rating", "GET", lambda: [(f"/users/{u}/rating", None) for u in user_ids()[:n]]),
+        ("/users/<int:user_id>/chemistry", "GET",
+         lambda: [(f"/users/{u}/chemistry?metric={('together', 'assists')[i % 2]}", None) for i, u in enumerate(user_ids()[:n])]),
+        ("/leaderboard", "GET", lambda: [("/leaderboard?metric=goals", None)] * n),
+        ("/groups/<int:group_id>/leaderboard", "GET", lambda: [("/groups/1/leaderboard?metric=win_rate", None)] * n),
+        ("/groups/<int:group_id>/timeline", "GET",
+         lambda: [("/groups/1/timeline?from=2025-01-01&to=2025-12-31&bucket=week", None)] * n),
+        ("/groups/<int:group_id>/dashboard", "GET", lambda: [(f"/groups/{g}/dashboard", None) for g in (1, 2)] * max(1, n // 2)),
+        ("/groups", "GET", lambda: [("/groups?limit=100", None)] * n),
+        ("/sessions", "GET", lambda: [("/sessions?limit=100", None)] * n),
+        ("/session_teams", "GET", lambda: [("/session_teams?limit=100", None)] * n),
+        ("/goals", "GET", lambda: [("/goals?limit=100", None)] * n),
+        ("/mvp_votes", "GET", lambda: [("/mvp_votes?limit=100", None)] * n),
+        ("/sessions/<int:session_id>/mvp", "GET",
+         lambda: [(f"/sessions/{sid}/mvp", None) for sid in (1, voting_session().id)] * max(1, n // 2)),
+        ("/sessions/<int:session_id>/scoreboard", "GET",
+         lambda: [(f"/sessions/{sid}/scoreboard", None) for sid in (1, open_session().id)] * max(1, n // 2)),
+        ("/users", "POST", lambda: [("/users", {"name": f"bench-{tag}-{i}"}) for i in range(n)]),
+        ("/groups", "POST", lambda: [("/groups", {"name": f"bench-{tag}-{i}"}) for i in range(n)]),
+        ("/sessions", "POST", lambda: [("/sessions", {"group_id": 1, "start_time": "2025-06-01T19:00:00"})] * n),
+        ("/session_teams", "POST", lambda: [("/session_teams", {"session_id": open_session().id, "name": f"bench-{tag}-{i}"}) for i in range(n)]),
+        ("/session_teams/<int:team_id>/members", "POST", members_requests),
+        ("/sessions/<int:session_id>/auto_teams", "POST", auto_teams_requests),
+        ("/goals", "POST", goal_requests),
+        ("/mvp_votes", "POST", vote_requests),
+        ("/sessions/<int:session_id>/events", "POST", events_requests),
+        ("/sessions/<int:session_id>/complete", "POST", complete_requests),
+    ]
+
+
+def bench_routes(app, counter, n):
+    results = {}
+    client = app.test_client()
+    scenarios = route_scenarios(n)
+
+    covered = {(rule, method) for rule, method, _ in scenarios}
+    for rule in app.url_map.iter_rules():
+        for method in rule.methods - {"HEAD", "OPTIONS"}:
+            if rule.endpoint != "static" and (rule.rule, method) not in covered:
+                print(f"  ⚠️  no benchmark scenario for {method} {rule.rule}")
+
+    for rule, method, setup in scenarios:
+        with app.app_context():
+            requests = setup()
+        latencies, queries = [], []
+        for url, body in requests:
+            counter.reset()
+            started = time.perf_counter()
+            response = client.open(url, method=method, json=body)
+            latencies.append(time.perf_counter() - started)
+            queries.append(counter.n)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{method} {url} -> {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        key = f"{method} {rule}"
+        results[key] = summarize(latencies, queries)
+        r = results[key]
+        print(f"  {key:45} p50 {r['p50_ms']:8.2f}ms  p95 {r['p95_ms']:8.2f}ms  p99 {r['p99_ms']:8.2f}ms  {r['queries']:3} queries")
+    return results
+
+
+def load_test(app, workers, duration):
+    """Hammer the GET routes from `workers` threads for `duration` seconds."""
+    urls = ["/users?limit=100", "/users/1", "/users/search?q=kh", "/groups", "/sessions?limit=100", "/goals?limit=100",
+            "/mvp_votes?limit=100", "/leaderboard", "/groups/1/leaderboard", "/sessions/1/scoreboard"]
+    deadline = time.perf_counter() + duration
+
+    def worker(seed_value):
+        rng = random.Random(seed_value)
+        client = app.test_client()
+        latencies = []
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            client.get(rng.choice(urls))
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        latencies = [l for batch in pool.map(worker, range(workers)) for l in batch]
+    result = summarize(latencies, elapsed=time.perf_counter() - started)
+    result["workers"] = workers
+    print(f"  load x{workers}: {result['rps']} req/s, p95 {result['p95_ms']}ms over {result['requests']} requests")
+    return result
+
+
+def compare(results, baseline, max_slowdown, min_slowdown_ms):
+    failures = []
+    for size, routes in baseline.items():
+        for key, base in routes.get("routes", {}).items():
+            now = results.get(size, {}).get("routes", {}).get(key)
+            if now is None:
+                continue
+            if now["queries"] > base["queries"]:
+                failures.append(f"[{size}] {key}: {base['queries']} -> {now['queries']} queries")
+            growth = now["p95_ms"] - base["p95_ms"]
+            if growth > min_slowdown_ms and now["p95_ms"] > base["p95_ms"] * (1 + max_slowdown):
+                failures.append(f"[{size}] {key}: p95 {base['p95_ms']}ms -> {now['p95_ms']}ms")
+    return failures
+
+
+def main():
+    args = parse_args()
+    results = {}
+    for size in args.sizes.split(","):
+        print(f"⏱  {size}: seeding {SIZES[size]}")
+        app = build_app(size, args.cache, args.replica)
+        with app.app_context():
+            counter = QueryCounter(db.engines.values())
+        routes = bench_routes(app, counter, args.requests)
+        results[size] = {"routes": routes, "load": load_test(app, args.workers, args.duration)}
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"💾 Saved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            failures = compare(results, json.load(f), args.max_slowdown, args.min_slowdown_ms)
+        if failures:
+            print("\n❌ Regressions:")
+            for line in failures:
+                print(f"  - {line}")
+            return 1
+        print("\n✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
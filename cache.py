@@ -0,0 +1,199 @@
+# cache.py
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, g, request
+
+
+class LRUBackend:
+    """In-process LRU (the default). Each worker has its own copy, so entries
+    also expire after CACHE_TTL seconds to bound cross-worker staleness."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires and expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl if ttl else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def tag_versions(self, tags):
+        with self._lock:
+            return [self._versions.get(t, 0) for t in tags]
+
+    def bump_tags(self, tags):
+        with self._lock:
+            for t in tags:
+                self._versions[t] = self._versions.get(t, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+class RedisBackend:
+    """Shared backend so invalidations reach every worker (needs the `redis` package)."""
+
+    def __init__(self, url, prefix="otp:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND='redis' needs the 'redis' package installed") from e
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl or None)
+
+    def tag_versions(self, tags):
+        if not tags:
+            return []
+        return [int(v or 0) for v in self.client.mget([f"{self.prefix}tag:{t}" for t in tags])]
+
+    def bump_tags(self, tags):
+        pipe = self.client.pipeline()
+        for t in tags:
+            pipe.incr(f"{self.prefix}tag:{t}")
+        pipe.execute()
+
+    def clear(self):
+        for key in self.client.scan_iter(f"{self.prefix}*"):
+            self.client.delete(key)
+
+
+class ResponseCache:
+    """Caches GET response bytes by path + query string.
+
+    Each entry records the versions of the tags it depends on (e.g.
+    "user:5", "session:3"). Writes bump those tags, and an entry whose tag
+    versions are out of date counts as a miss, so invalidation is exact and
+    costs one counter bump per tag.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("CACHE_BACKEND", "lru")   # "lru", "redis" or "none"
+        app.config.setdefault("CACHE_MAX_ENTRIES", 1024)
+        app.config.setdefault("CACHE_TTL", 60)
+        app.config.setdefault("CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+        kind = app.config["CACHE_BACKEND"]
+        if kind == "lru":
+            self.backend = LRUBackend(app.config["CACHE_MAX_ENTRIES"])
+        elif kind == "redis":
+            self.backend = RedisBackend(app.config["CACHE_REDIS_URL"])
+        elif kind == "none":
+            self.backend = None
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND {kind!r}")
+        app.extensions["response_cache"] = self
+
+    def invalidate(self, *tags):
+        tags = {t for t in tags if t}
+        if self.backend is not None and tags:
+            self.backend.bump_tags(sorted(tags))
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+
+def _cache():
+    return current_app.extensions.get("response_cache")
+
+
+def cache_tags(*tags):
+    """Tag the response being built, e.g. with the ids of rows it contains."""
+    g.setdefault("cache_tags", set()).update(tags)
+
+
+def invalidate(*tags):
+    cache = _cache()
+    if cache is not None:
+        cache.invalidate(*tags)
+
+
+def _not_modified(etag):
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def cached(*static_tags):
+    """Cache a GET view. `static_tags` may use the view's URL args, e.g. "user:{user_id}"."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**kwargs):
+            cache = _cache()
+            view_fn = current_app.ensure_sync(view)
+            if cache is None or cache.backend is None or request.method != "GET":
+                return view_fn(**kwargs)
+            backend = cache.backend
+            key = f"{request.path}?{'&'.join(sorted(request.query_string.decode().split('&')))}"
+
+            entry = backend.get(key)
+            if entry is not None:
+                etag, body, mimetype, tags, versions = entry
+                if backend.tag_versions(tags) == versions:
+                    if request.if_none_match.contains(etag):
+                        return _not_modified(etag)
+                    response = current_app.response_class(body, mimetype=mimetype)
+                    response.set_etag(etag)
+                    return response
+
+            # Versions are read before the body is built, so a write that
+            # commits meanwhile bumps past them and the entry is born stale
+            static = sorted({t.format(**kwargs) for t in static_tags})
+            known = dict(zip(static, backend.tag_versions(static)))
+            g.cache_tags = set(static)
+            response = current_app.make_response(view_fn(**kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+
+            # Tags added by the view (the rows it returned) are only known now;
+            # a write racing the read on one of them is bounded by CACHE_TTL
+            tags = sorted(g.cache_tags)
+            added = [t for t in tags if t not in known]
+            known.update(zip(added, backend.tag_versions(added)))
+            versions = [known[t] for t in tags]
+            body = response.get_data()
+            etag = hashlib.sha1(body).hexdigest()
+            backend.set(key, (etag, body, response.mimetype, tags, versions), current_app.config["CACHE_TTL"])
+            response.set_etag(etag)
+            if request.if_none_match.contains(etag):
+                return _not_modified(etag)
+            return response
+
+        return wrapper
+
+    return decorator
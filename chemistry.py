@@ -0,0 +1,165 @@
+# chemistry.py
+from collections import defaultdict
+import numpy as np
+from sqlalchemy import func
+from db import db, upsert_insert
+from models import User, Session, SessionTeam, SessionTeamMembership, Goal, PairStats
+
+PAIR_COUNTERS = ("assists", "assisted_by", "together", "wins_together", "against", "wins_against")
+METRICS = ("together", "win_rate_together", "assists", "assisted_by", "against", "wins_against")
+
+
+def pair_matrices(n_players, m_team, m_player, team_session, team_won, n_sessions, a_assist, a_scorer):
+    """Pair-count matrices for one group, indexed [player, other].
+
+    m_team/m_player are the roster as parallel arrays of team and player
+    indexes; team_session/team_won describe each team. A is the
+    team x player incidence matrix, so Aᵀ·A counts the games two players
+    shared a team, and Aᵀ·O, where O holds each team's opponents in the
+    same session, counts the games they faced each other.
+    """
+    n_teams = len(team_session)
+    A = np.zeros((n_teams, n_players), dtype=np.int32)
+    A[m_team, m_player] = 1
+    W = A * team_won[:, None].astype(np.int32)
+
+    # Everyone in the session minus the team itself = that team's opponents
+    per_session = np.zeros((n_sessions, n_players), dtype=np.int32)
+    np.add.at(per_session, team_session, A)
+    O = per_session[team_session] - A
+
+    assists = np.zeros((n_players, n_players), dtype=np.int32)
+    np.add.at(assists, (a_assist, a_scorer), 1)
+
+    m = {
+        "assists": assists,
+        "assisted_by": assists.T,
+        "together": A.T @ A,
+        "wins_together": W.T @ W,
+        "against": A.T @ O,
+        "wins_against": W.T @ O,
+    }
+    for k in ("together", "wins_together", "against", "wins_against"):
+        np.fill_diagonal(m[k], 0)
+    return m
+
+
+def _facts(session_ids=None):
+    """Rosters and assists of completed sessions, grouped by group_id.
+
+    With `session_ids` only those sessions are read; otherwise every completed one.
+    """
+    roster = (
+        db.session.query(Session.group_id, Session.id, SessionTeam.id, SessionTeamMembership.user_id,
+                         func.coalesce(Session.winner_team_id, 0))  # 0: a draw
+        .join(SessionTeam, SessionTeam.session_id == Session.id)
+        .join(SessionTeamMembership, SessionTeamMembership.session_team_id == SessionTeam.id)
+        .filter(Session.completed_at.isnot(None))
+    )
+    assists = (
+        db.session.query(Session.group_id, Goal.assist_id, Goal.scorer_id)
+        .join(Session, Session.id == Goal.session_id)
+        .filter(Session.completed_at.isnot(None), Goal.assist_id.isnot(None))
+    )
+    if session_ids is not None:
+        roster = roster.filter(Session.id.in_(session_ids))
+        assists = assists.filter(Session.id.in_(session_ids))
+
+    groups = defaultdict(lambda: {"roster": [], "assists": []})
+    for g_id, *row in roster:
+        groups[g_id]["roster"].append(row)
+    for g_id, *row in assists:
+        groups[g_id]["assists"].append(row)
+    return groups
+
+
+def _index(values):
+    """Dense 0..n-1 codes for `values`, plus the distinct values in code order."""
+    distinct, codes = np.unique(np.asarray(values, dtype=np.int64), return_inverse=True)
+    return codes, distinct
+
+
+def _group_rows(group_id, roster, assists):
+    """pair_stats rows for one group's facts: one per ordered pair with any nonzero counter."""
+    if not roster:
+        return []
+    r = np.asarray(roster, dtype=np.int64).reshape(-1, 4)  # session, team, user, winner_team
+    a = np.asarray(assists, dtype=np.int64).reshape(-1, 2)  # assist, scorer
+
+    p_codes, players = _index(np.concatenate([r[:, 2], a.ravel()]))
+    m_player, a_codes = p_codes[:len(r)], p_codes[len(r):].reshape(-1, 2)
+    m_team, teams = _index(r[:, 1])
+    s_codes, _ = _index(r[:, 0])
+
+    # Per-team session and result, from any roster row of that team
+    first = np.zeros(len(teams), dtype=np.int64)
+    first[m_team] = np.arange(len(r))
+    team_session = s_codes[first]
+    team_won = r[first, 3] == teams
+
+    m = pair_matrices(len(players), m_team, m_player, team_session, team_won, s_codes.max() + 1,
+                      a_codes[:, 0], a_codes[:, 1])
+    stacked = np.stack([m[k] for k in PAIR_COUNTERS])
+    u, o = np.nonzero(stacked.any(axis=0))
+    values = stacked[:, u, o].T.tolist()
+    return [
+        {"group_id": group_id, "user_id": int(players[i]), "other_id": int(players[j]), **dict(zip(PAIR_COUNTERS, v))}
+        for i, j, v in zip(u, o, values)
+    ]
+
+
+def _rows(groups):
+    return [row for g_id, f in groups.items() for row in _group_rows(g_id, f["roster"], f["assists"])]
+
+
+def _upsert(rows):
+    if not rows:
+        return
+    insert = upsert_insert()
+    stmt = insert(PairStats)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PairStats.group_id, PairStats.user_id, PairStats.other_id],
+        set_={k: getattr(PairStats, k) + getattr(stmt.excluded, k) for k in PAIR_COUNTERS},
+    )
+    db.session.execute(stmt, rows)
+
+
+def apply_completed_session(session):
+    """Add one completed session's pairs to its group's matrices. Returns the players touched."""
+    rows = _rows(_facts([session.id]))
+    _upsert(rows)
+    return {r["user_id"] for r in rows}
+
+
+def rebuild_chemistry():
+    """Recompute pair_stats for every group from completed sessions."""
+    rows = _rows(_facts())
+    db.session.query(PairStats).delete()
+    if rows:
+        db.session.execute(PairStats.__table__.insert(), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def read_chemistry(user_id, group_id, metric, limit, min_games=1):
+    """A player's partners ranked by `metric`, summed over groups unless `group_id` is given."""
+    sums = {k: func.sum(getattr(PairStats, k)).label(k) for k in PAIR_COUNTERS}
+    win_rate = func.coalesce(func.cast(sums["wins_together"], db.Float) / func.nullif(sums["together"], 0), 0.0)
+    query = (
+        db.session.query(PairStats.other_id, User.name, *sums.values(), win_rate.label("win_rate_together"))
+        .join(User, User.id == PairStats.other_id)
+        .filter(PairStats.user_id == user_id)
+        .group_by(PairStats.other_id, User.name)
+    )
+    if group_id is not None:
+        query = query.filter(PairStats.group_id == group_id)
+    if metric == "win_rate_together":
+        query = query.having(sums["together"] >= min_games)
+    order = win_rate if metric == "win_rate_together" else sums[metric]
+    rows = query.order_by(order.desc(), PairStats.other_id).limit(limit)
+    return [{
+        "user_id": r.other_id,
+        "name": r.name,
+        **{k: getattr(r, k) for k in PAIR_COUNTERS},
+        "win_rate_together": round(r.win_rate_together, 3),
+    } for r in rows]
@@ -0,0 +1,112 @@
+# dashboard.py
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload, selectinload
+from db import db
+from models import User, Group, GroupMembership, Session, SessionTeam, SessionTeamMembership, Goal
+import leaderboard
+
+# Caps on each section; sessions stay well under SQLAlchemy's 500-id IN batch,
+# so selectinload(Session.teams) is always a single statement
+MAX_MEMBERS = 200
+MAX_SESSIONS = 20
+MAX_TOP_PLAYERS = 20
+
+
+def _members(group_id, limit):
+    """The first `limit` members by join date, and the group's member count, in one query."""
+    rows = (
+        db.session.query(User.id, User.name, User.preferred_position, GroupMembership.joined_at,
+                         func.count().over().label("total"))
+        .join(GroupMembership, GroupMembership.user_id == User.id)
+        .filter(GroupMembership.group_id == group_id)
+        .order_by(GroupMembership.joined_at, GroupMembership.id)
+        .limit(limit)
+        .all()
+    )
+    items = [{
+        "user_id": r.id,
+        "name": r.name,
+        "preferred_position": r.preferred_position,
+        "joined_at": r.joined_at.isoformat() if r.joined_at else None,
+    } for r in rows]
+    return items, rows[0].total if rows else 0
+
+
+def _sessions(group_id, limit):
+    """The group's latest `limit` sessions with their teams, rosters and scores.
+
+    Three statements however many teams and players the sessions have:
+    the sessions with their teams (selectinload), every roster joined to
+    its users, and one grouped goal count per team. Scores are counted
+    from goals, so sessions still in play show their live score.
+    """
+    sessions = (
+        Session.query
+        .options(selectinload(Session.teams))
+        .filter(Session.group_id == group_id)
+        .order_by(Session.start_time.desc(), Session.id.desc())
+        .limit(limit)
+        .all()
+    )
+    if not sessions:
+        return []
+    session_ids = [s.id for s in sessions]
+
+    players = {}
+    for team_id, u_id, name in (
+        db.session.query(SessionTeamMembership.session_team_id, User.id, User.name)
+        .join(SessionTeam, SessionTeam.id == SessionTeamMembership.session_team_id)
+        .join(User, User.id == SessionTeamMembership.user_id)
+        .filter(SessionTeam.session_id.in_(session_ids))
+        .order_by(SessionTeamMembership.session_team_id, User.id)
+    ):
+        players.setdefault(team_id, []).append({"user_id": u_id, "name": name})
+    goals = dict(
+        db.session.query(Goal.team_id, func.count(Goal.id))
+        .filter(Goal.session_id.in_(session_ids))
+        .group_by(Goal.team_id)
+    )
+
+    out = []
+    for s in sessions:
+        teams = sorted(s.teams, key=lambda t: t.id)
+        total = sum(goals.get(t.id, 0) for t in teams)
+        out.append({
+            "id": s.id,
+            "location": s.location,
+            "start_time": s.start_time.isoformat(),
+            "completed_at": s.completed_at.isoformat() if s.completed_at else None,
+            "winner_team_id": s.winner_team_id,
+            "teams": [{
+                "id": t.id,
+                "name": t.name,
+                "captain_id": t.captain_id,
+                "goals_for": goals.get(t.id, 0),
+                "goals_against": total - goals.get(t.id, 0),
+                "players": players.get(t.id, []),
+            } for t in teams],
+        })
+    return out
+
+
+def group_dashboard(group_id, members=50, sessions=5, top=5):
+    """Everything a group page shows, or None for an unknown group.
+
+    At most seven statements whatever the size of the group: the group
+    with its leader, a page of members with the member count, the recent
+    sessions (three, see _sessions) and the top scorers from the
+    precomputed all-time leaderboard.
+    """
+    group = db.session.get(Group, group_id, options=[joinedload(Group.leader)])
+    if group is None:
+        return None
+    member_items, member_count = _members(group_id, members)
+    return {
+        "id": group.id,
+        "name": group.name,
+        "leader": {"user_id": group.leader.id, "name": group.leader.name} if group.leader else None,
+        "member_count": member_count,
+        "members": member_items,
+        "recent_sessions": _sessions(group_id, sessions),
+        "top_players": leaderboard.read_leaderboard(group_id, "goals", "all", top, 0),
+    }
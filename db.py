@@ -1,3 +1,114 @@
+from flask import has_request_context, request
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 
-db = SQLAlchemy()
+REPLICA_BIND = "replica"
+READ_METHODS = ("GET", "HEAD")
+
+
+class RoutingSession(Session):
+    """db.session that sends the reads of GET and HEAD requests to the read replica.
+
+    With SQLALCHEMY_REPLICA_URI set, a plain SELECT issued while handling
+    a GET/HEAD request runs on the "replica" bind. Everything else runs on
+    the primary: writes, SELECT ... FOR UPDATE, raw SQL, other methods,
+    jobs and CLI commands. The first write of a request pins the rest of
+    it to the primary, so a handler always reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and REPLICA_BIND in self._db.engines and self._reads_from_replica(clause):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_replica(self, clause):
+        if self.info.get("pinned_to_primary") or not has_request_context() or request.method not in READ_METHODS:
+            return False
+        if self._flushing or clause is None:
+            # A flush writes; no clause means a caller wants the connection itself
+            self.info["pinned_to_primary"] = self._flushing
+            return False
+        if getattr(clause, "is_select", False) and getattr(clause, "_for_update_arg", None) is None:
+            return True
+        self.info["pinned_to_primary"] = True
+        return False
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+
+def pin_to_primary():
+    """Send the rest of this request's statements to the primary.
+
+    Call it before a read whose result decides a write, so a lagging
+    replica cannot make a GET handler redo work the primary already has.
+    """
+    db.session.info["pinned_to_primary"] = True
+
+# WAL lets readers run alongside the single writer; NORMAL is durable in WAL
+# mode except for the last commits on power loss; busy_timeout makes writers
+# wait for the lock instead of failing with "database is locked".
+SQLITE_PRODUCTION_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,          # ms
+    "foreign_keys": "ON",
+    "cache_size": -64000,          # negative = KiB, so 64 MB
+    "mmap_size": 268435456,        # 256 MB
+    "temp_store": "MEMORY",
+}
+
+
+def engine_options(config, uri=None):
+    """SQLALCHEMY_ENGINE_OPTIONS built from the DB_POOL_* settings (for `uri`, default the primary)."""
+    url = make_url(uri or config["SQLALCHEMY_DATABASE_URI"])
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite uses a single shared connection; pool sizing does not apply
+        return {}
+    return {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": True,
+    }
+
+
+def configure_replica(config):
+    """Add the "replica" bind when SQLALCHEMY_REPLICA_URI is set, pooled like the primary."""
+    uri = config.get("SQLALCHEMY_REPLICA_URI")
+    if uri:
+        config.setdefault("SQLALCHEMY_BINDS", {})[REPLICA_BIND] = {"url": uri, **engine_options(config, uri)}
+
+
+def read_only_sqlite_uri(uri):
+    """A read-only URI for the same SQLite file, to use as SQLALCHEMY_REPLICA_URI.
+
+    The primary must be in WAL mode (the production pragmas), so the
+    read-only pool reads alongside the writer.
+    """
+    return f"sqlite:///file:{make_url(uri).database}?mode=ro&uri=true"
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Run `pragmas` on every new DBAPI connection of a SQLite engine (no-op otherwise)."""
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def upsert_insert():
+    """Dialect `insert` construct that supports on_conflict_do_update (SQLite or PostgreSQL)."""
+    if db.session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
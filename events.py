@@ -0,0 +1,153 @@
+# events.py
+from collections import Counter, defaultdict
+from db import db
+from models import User, SessionTeam, SessionTeamMembership, Goal, MvpVote
+from stats import bump_many_user_stats
+import leaderboard
+import rollups
+from mvp import add_to_tally, eligibility_error, window_error
+
+
+SECTIONS = ("roster", "goals", "votes")
+USER_KEYS = ("user_id", "scorer_id", "assist_id", "voter_id", "voted_for_id")
+
+
+def _is_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _ids(items, *keys):
+    return {item.get(k) for item in items if isinstance(item, dict) for k in keys if _is_id(item.get(k))}
+
+
+def batch_error(data):
+    """Why a request body is not an events batch, or None."""
+    if not isinstance(data, dict):
+        return "body must be a JSON object"
+    bad = [k for k in SECTIONS if not isinstance(data.get(k) or [], list)]
+    if bad:
+        return f"'{bad[0]}' must be a list"
+    return None
+
+
+def ingest_session_events(session, data):
+    """Write a batch of roster entries, goals (with assists) and MVP votes for one session.
+
+    Every item is validated up front against a handful of set lookups; the
+    valid ones are inserted with one executemany per table and the rest are
+    reported back by index; `data` must have passed batch_error. Nothing is
+    committed here — the caller owns the transaction. Returns (inserted
+    counts, errors, ids of users whose stats changed).
+    """
+    roster = data.get("roster") or []
+    goals = data.get("goals") or []
+    votes = data.get("votes") or []
+    errors = {"roster": [], "goals": [], "votes": []}
+
+    # Look-ups shared by all validation (constant number of queries)
+    team_ids = {t_id for (t_id,) in db.session.query(SessionTeam.id).filter_by(session_id=session.id)}
+    referenced = _ids(roster, "user_id") | _ids(goals, "scorer_id", "assist_id") | _ids(votes, "voter_id", "voted_for_id")
+    user_ids = {u_id for (u_id,) in db.session.query(User.id).filter(User.id.in_(referenced))} if referenced else set()
+    on_roster = set(
+        db.session.query(SessionTeamMembership.session_team_id, SessionTeamMembership.user_id)
+        .filter(SessionTeamMembership.session_team_id.in_(team_ids))
+    ) if team_ids else set()
+    players_before = {u_id for _, u_id in on_roster}
+    voted = {v_id for (v_id,) in db.session.query(MvpVote.voter_id).filter_by(session_id=session.id)}
+
+    def check(section, index, item, required):
+        if not isinstance(item, dict):
+            errors[section].append({"index": index, "error": "item must be an object"})
+            return False
+        missing = [k for k in required if item.get(k) is None]
+        if missing:
+            errors[section].append({"index": index, "error": f"missing {', '.join(missing)}"})
+            return False
+        not_ids = [k for k in ("team_id", *USER_KEYS) if item.get(k) is not None and not _is_id(item[k])]
+        if not_ids:
+            errors[section].append({"index": index, "error": f"{not_ids[0]} must be an integer"})
+            return False
+        unknown = [item[k] for k in USER_KEYS if item.get(k) is not None and item[k] not in user_ids]
+        if unknown:
+            errors[section].append({"index": index, "error": f"unknown user {unknown[0]}"})
+            return False
+        if "team_id" in required and item["team_id"] not in team_ids:
+            errors[section].append({"index": index, "error": f"team {item['team_id']} is not in session {session.id}"})
+            return False
+        return True
+
+    deltas = defaultdict(lambda: defaultdict(int))
+
+    roster_rows = []
+    for i, item in enumerate(roster):
+        if not check("roster", i, item, ("team_id", "user_id")):
+            continue
+        key = (item["team_id"], item["user_id"])
+        if key in on_roster:
+            errors["roster"].append({"index": i, "error": "player already on this team"})
+            continue
+        on_roster.add(key)
+        roster_rows.append({"session_team_id": item["team_id"], "user_id": item["user_id"]})
+        deltas[item["user_id"]]["teams_played"] += 1
+    for u_id in {r["user_id"] for r in roster_rows} - players_before:
+        deltas[u_id]["sessions_played"] += 1
+
+    goal_rows = []
+    for i, item in enumerate(goals):
+        if not check("goals", i, item, ("team_id", "scorer_id")):
+            continue
+        if item.get("assist_id") == item["scorer_id"]:
+            errors["goals"].append({"index": i, "error": "scorer cannot assist themselves"})
+            continue
+        goal_rows.append({
+            "session_id": session.id,
+            "team_id": item["team_id"],
+            "scorer_id": item["scorer_id"],
+            "assist_id": item.get("assist_id"),
+            "minute": item.get("minute"),
+        })
+        deltas[item["scorer_id"]]["goals"] += 1
+        if item.get("assist_id") is not None:
+            deltas[item["assist_id"]]["assists"] += 1
+
+    vote_rows = []
+    closed = window_error(session) if votes else None
+    players = {u_id for _, u_id in on_roster}
+    for i, item in enumerate(votes):
+        if not check("votes", i, item, ("voter_id", "voted_for_id")):
+            continue
+        if closed:
+            errors["votes"].append({"index": i, "error": closed})
+            continue
+        ineligible = eligibility_error(item["voter_id"], item["voted_for_id"], players)
+        if ineligible:
+            errors["votes"].append({"index": i, "error": ineligible})
+            continue
+        if item["voter_id"] == item["voted_for_id"]:
+            errors["votes"].append({"index": i, "error": "cannot vote for yourself"})
+            continue
+        if item["voter_id"] in voted:
+            errors["votes"].append({"index": i, "error": "voter already voted in this session"})
+            continue
+        voted.add(item["voter_id"])
+        vote_rows.append({"session_id": session.id, "voter_id": item["voter_id"], "voted_for_id": item["voted_for_id"]})
+        deltas[item["voted_for_id"]]["mvp_votes_received"] += 1
+
+    # One executemany per table
+    for table, rows in (
+        (SessionTeamMembership.__table__, roster_rows),
+        (Goal.__table__, goal_rows),
+        (MvpVote.__table__, vote_rows),
+    ):
+        if rows:
+            db.session.execute(table.insert(), rows)
+
+    # One counter upsert for every affected user, not one per event
+    bump_many_user_stats(deltas)
+    vote_counts = Counter(r["voted_for_id"] for r in vote_rows)
+    add_to_tally(session.id, vote_counts)
+    leaderboard.apply_mvp_votes(session, vote_counts)
+    rollups.apply_mvp_votes(session, vote_counts)
+
+    inserted = {"roster": len(roster_rows), "goals": len(goal_rows), "votes": len(vote_rows)}
+    return inserted, {k: v for k, v in errors.items() if v}, set(deltas)
@@ -0,0 +1,270 @@
+# export.py
+"""Columnar exports for offline reporting.
+
+    flask export tables exports/                 # every table, Parquet
+    flask export tables exports/ -t goals        # one table
+    flask export match-facts exports/            # the denormalized per-player table
+
+Each table becomes a directory of part files (a dataset that pyarrow,
+pandas, DuckDB or Spark read as one table). Tables that are only ever
+appended to are exported incrementally: a run writes one new part with
+the rows past the last exported id, as recorded in manifest.json. Tables
+updated in place (a session gets completed_at, a team its score) are
+rewritten on every run. Rows are streamed from one query per table in
+--chunk-size batches, so memory stays flat however big the table is.
+
+pyarrow is only imported by these commands; the web app never loads it.
+"""
+import json
+import os
+from datetime import datetime
+import click
+from flask.cli import AppGroup
+from sqlalchemy import case, func, select, types
+from db import db
+from models import User, Group, GroupMembership, Session, SessionTeam, SessionTeamMembership, Goal, MvpVote
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+MANIFEST = "manifest.json"
+
+# name -> (table, incremental on id)
+EXPORT_TABLES = {
+    "users": (User.__table__, False),
+    "groups": (Group.__table__, False),
+    "group_memberships": (GroupMembership.__table__, True),
+    "sessions": (Session.__table__, False),
+    "session_teams": (SessionTeam.__table__, False),
+    "session_team_memberships": (SessionTeamMembership.__table__, True),
+    "goals": (Goal.__table__, True),
+    "mvp_votes": (MvpVote.__table__, True),
+}
+
+export_cli = AppGroup("export", help="Export tables to Parquet/Arrow files for offline reporting.")
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise click.ClickException("exports need pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def arrow_type(pa, sa_type):
+    """The Arrow type a column is written as; JSON columns are written as JSON text."""
+    if isinstance(sa_type, types.Boolean):
+        return pa.bool_()
+    if isinstance(sa_type, types.Integer):
+        return pa.int64()
+    if isinstance(sa_type, (types.Float, types.Numeric)):
+        return pa.float64()
+    if isinstance(sa_type, types.DateTime):
+        return pa.timestamp("us")
+    if isinstance(sa_type, types.Date):
+        return pa.date32()
+    return pa.string()
+
+
+def _schema(pa, columns):
+    return pa.schema([
+        pa.field(c.name, arrow_type(pa, c.type), nullable=getattr(c, "nullable", True)) for c in columns
+    ])
+
+
+def _batch(pa, schema, columns, rows):
+    arrays = []
+    for field, column, values in zip(schema, columns, zip(*rows)):
+        if isinstance(column.type, types.JSON):
+            values = [None if v is None else json.dumps(v) for v in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _write_part(pa, path, schema, batches, fmt):
+    """Write `batches` to `path` (through a temp file, so a crash never leaves half a part). Returns rows written."""
+    tmp = path + ".tmp"
+    n = 0
+    if fmt == "parquet":
+        writer = pa.parquet.ParquetWriter(tmp, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(tmp, schema)
+    try:
+        with writer:
+            for batch in batches:
+                writer.write_batch(batch)
+                n += batch.num_rows
+    except BaseException:
+        os.remove(tmp)
+        raise
+    if n:
+        os.replace(tmp, path)
+    else:
+        os.remove(tmp)
+    return n
+
+
+def _stream(pa, stmt, columns, chunk_size):
+    """Record batches of `stmt`'s rows, fetched `chunk_size` at a time from one query."""
+    schema = _schema(pa, columns)
+    result = db.session.execute(stmt.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        yield _batch(pa, schema, columns, rows)
+
+
+def _load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {"tables": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def _clear(table_dir):
+    for name in os.listdir(table_dir):
+        if name.startswith("part-"):
+            os.remove(os.path.join(table_dir, name))
+
+
+def export_table(pa, out_dir, name, stmt, columns, fmt, chunk_size, manifest, key=None, full=False):
+    """Export one table (or query) to out_dir/name/, updating `manifest`. Returns rows written.
+
+    With a `key` column the export is incremental: only rows with a larger
+    key than the last run's are read, into a new part. Without one (or
+    with `full`) the directory is rewritten.
+    """
+    table_dir = os.path.join(out_dir, name)
+    os.makedirs(table_dir, exist_ok=True)
+    state = manifest["tables"].get(name)
+    if state and state["format"] != fmt and not full:
+        raise click.ClickException(f"{name} was exported as {state['format']}; use --full to switch formats")
+    if key is None or full or state is None:
+        _clear(table_dir)
+        state = {"format": fmt, "parts": [], "rows": 0, "last_id": None}
+
+    if key is not None:
+        if state["last_id"] is not None:
+            stmt = stmt.where(key > state["last_id"])
+        stmt = stmt.order_by(key)
+    part = f"part-{len(state['parts']) + 1:05d}{FORMATS[fmt]}"
+    schema = _schema(pa, columns)
+    last = {}
+
+    def batches():
+        for batch in _stream(pa, stmt, columns, chunk_size):
+            if key is not None:
+                last["id"] = batch.column(key.name)[-1].as_py()
+            yield batch
+
+    n = _write_part(pa, os.path.join(table_dir, part), schema, batches(), fmt)
+    if n:
+        state["parts"].append(part)
+        state["rows"] += n
+        state["last_id"] = last.get("id", state["last_id"])
+    state["exported_at"] = datetime.utcnow().isoformat()
+    manifest["tables"][name] = state
+    return n
+
+
+def match_facts_select():
+    """One row per player per completed session: who, where, for which team, the result and their output.
+
+    Goals, assists and votes are aggregated once per (session, player) and
+    joined to the rosters in a single statement.
+    """
+    def per_player(user_col, session_col, label):
+        return (
+            select(session_col.label("session_id"), user_col.label("user_id"), func.count().label(label))
+            .group_by(session_col, user_col)
+            .subquery(label)
+        )
+
+    goals = per_player(Goal.scorer_id, Goal.session_id, "goals")
+    assists = per_player(Goal.assist_id, Goal.session_id, "assists")
+    votes = per_player(MvpVote.voted_for_id, MvpVote.session_id, "mvp_votes")
+
+    def joined(sub):
+        return (sub, (sub.c.session_id == Session.id) & (sub.c.user_id == SessionTeamMembership.user_id))
+
+    result = case(
+        (Session.winner_team_id == SessionTeam.id, "win"),
+        (Session.winner_team_id.is_(None), "draw"),
+        else_="loss",
+    )
+    return (
+        select(
+            SessionTeamMembership.id.label("membership_id"),
+            Session.id.label("session_id"),
+            Session.group_id,
+            Group.name.label("group_name"),
+            Session.location,
+            Session.start_time,
+            Session.completed_at,
+            SessionTeam.id.label("team_id"),
+            SessionTeam.name.label("team_name"),
+            SessionTeam.goals_for,
+            SessionTeam.goals_against,
+            result.label("result"),
+            User.id.label("user_id"),
+            User.name.label("user_name"),
+            User.preferred_position,
+            func.coalesce(goals.c.goals, 0).label("goals"),
+            func.coalesce(assists.c.assists, 0).label("assists"),
+            func.coalesce(votes.c.mvp_votes, 0).label("mvp_votes"),
+        )
+        .select_from(SessionTeamMembership)
+        .join(SessionTeam, SessionTeam.id == SessionTeamMembership.session_team_id)
+        .join(Session, Session.id == SessionTeam.session_id)
+        .join(Group, Group.id == Session.group_id)
+        .join(User, User.id == SessionTeamMembership.user_id)
+        .outerjoin(*joined(goals))
+        .outerjoin(*joined(assists))
+        .outerjoin(*joined(votes))
+        .where(Session.completed_at.isnot(None))
+        .order_by(Session.id, SessionTeam.id, User.id)
+    )
+
+
+def _options(fn):
+    fn = click.option("--chunk-size", type=int, default=50000, show_default=True, help="Rows fetched per batch.")(fn)
+    fn = click.option("--format", "fmt", type=click.Choice(sorted(FORMATS)), default="parquet", show_default=True)(fn)
+    return click.argument("out_dir", type=click.Path(file_okay=False))(fn)
+
+
+@export_cli.command("tables")
+@_options
+@click.option("--table", "-t", "tables", multiple=True, type=click.Choice(sorted(EXPORT_TABLES)),
+              help="Export only this table (repeatable); default all.")
+@click.option("--full", is_flag=True, help="Re-export append-only tables from scratch.")
+def export_tables_command(out_dir, fmt, chunk_size, tables, full):
+    """Export model tables; append-only ones incrementally."""
+    pa = _pyarrow()
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = _load_manifest(out_dir)
+    for name in tables or EXPORT_TABLES:
+        table, incremental = EXPORT_TABLES[name]
+        key = table.c.id if incremental else None
+        n = export_table(pa, out_dir, name, select(table), list(table.columns), fmt, chunk_size, manifest, key, full)
+        _save_manifest(out_dir, manifest)
+        print(f"✅ {name}: {n} rows ({manifest['tables'][name]['rows']} exported in total)")
+
+
+@export_cli.command("match-facts")
+@_options
+def export_match_facts_command(out_dir, fmt, chunk_size):
+    """Export the denormalized match facts table (rewritten each run)."""
+    pa = _pyarrow()
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = _load_manifest(out_dir)
+    stmt = match_facts_select()
+    n = export_table(pa, out_dir, "match_facts", stmt, list(stmt.selected_columns), fmt, chunk_size, manifest)
+    _save_manifest(out_dir, manifest)
+    print(f"✅ match_facts: {n} rows")
@@ -0,0 +1,173 @@
+# instrumentation.py
+import bisect
+import heapq
+import hmac
+import json
+import logging
+import random
+import threading
+import time
+from flask import abort, g, has_request_context, jsonify, request
+from sqlalchemy import event
+from db import db
+
+logger = logging.getLogger("offthepost.sql")
+
+# Histogram upper bounds; the last bucket catches everything above
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000]
+QUERY_BUCKETS = [0, 1, 2, 3, 5, 10, 20, 50, 100]
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def to_dict(self):
+        n = sum(self.counts)
+        return {
+            "count": n,
+            "mean": round(self.total / n, 3) if n else 0,
+            "max": round(self.max, 3),
+            # A list, so the buckets keep their order through jsonify
+            "buckets": [{"le": le, "count": c} for le, c in zip(self.bounds + ["+Inf"], self.counts)],
+        }
+
+
+class SQLProfiler:
+    """Opt-in per-request SQL instrumentation.
+
+    With SQL_PROFILING on, a sampled request (SQL_PROFILING_SAMPLE_RATE)
+    collects its query count, total DB time and slowest statements from the
+    engine's cursor events. These go out as a Server-Timing header and a
+    structured log line, and feed the per-route histograms served at
+    /debug/metrics. Requests that are not sampled only pay for one check
+    per statement. A streamed response runs its queries while the body is
+    sent, so it is recorded when the response closes and gets no
+    Server-Timing header. /debug/metrics only exists with SQL_METRICS_TOKEN
+    set and answers requests carrying "Authorization: Bearer <token>".
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self.routes = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("SQL_PROFILING", False)
+        app.config.setdefault("SQL_PROFILING_SAMPLE_RATE", 1.0)
+        app.config.setdefault("SQL_SLOW_QUERY_MS", 100)
+        app.config.setdefault("SQL_PROFILING_TOP_N", 3)
+        app.config.setdefault("SQL_METRICS_TOKEN", None)
+        app.extensions["sql_profiler"] = self
+        if not app.config["SQL_PROFILING"]:
+            return
+
+        self.sample_rate = app.config["SQL_PROFILING_SAMPLE_RATE"]
+        self.slow_ms = app.config["SQL_SLOW_QUERY_MS"]
+        self.top_n = app.config["SQL_PROFILING_TOP_N"]
+
+        with app.app_context():
+            # The primary and, when configured, the read replica
+            for engine in db.engines.values():
+                event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+                event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        self.metrics_token = app.config["SQL_METRICS_TOKEN"]
+        if self.metrics_token:
+            app.add_url_rule("/debug/metrics", "debug_metrics", self.metrics_view)
+
+    # --- engine events ---
+
+    @staticmethod
+    def _profile():
+        return g.get("sql_profile") if has_request_context() else None
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self._profile() is not None:
+            context._otp_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        profile = self._profile()
+        started = getattr(context, "_otp_started", None)
+        if profile is None or started is None:
+            return
+        ms = (time.perf_counter() - started) * 1000
+        profile["queries"] += 1
+        profile["db_ms"] += ms
+        entry = (ms, profile["queries"], statement)
+        if len(profile["slowest"]) < self.top_n:
+            heapq.heappush(profile["slowest"], entry)
+        else:
+            heapq.heappushpop(profile["slowest"], entry)
+
+    # --- request hooks ---
+
+    def _start_request(self):
+        if random.random() < self.sample_rate:
+            g.sql_profile = {"started": time.perf_counter(), "queries": 0, "db_ms": 0.0, "slowest": []}
+
+    def _finish_request(self, response):
+        profile = g.get("sql_profile")
+        if profile is None:
+            return response
+        route = f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"
+        path = request.full_path.rstrip("?")
+        if response.is_streamed:
+            # The body's queries have not run yet; g.sql_profile keeps counting them
+            response.call_on_close(lambda: self._record(profile, route, path, response.status_code))
+            return response
+        g.pop("sql_profile")
+        total_ms = self._record(profile, route, path, response.status_code)
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={profile["db_ms"]:.2f};desc="{profile["queries"]} queries", app;dur={total_ms:.2f}',
+        )
+        return response
+
+    def _record(self, profile, route, path, status):
+        """Log one request's profile and add it to the route's histograms. Returns its total ms."""
+        total_ms = (time.perf_counter() - profile["started"]) * 1000
+        slowest = [
+            {"ms": round(ms, 3), "sql": " ".join(sql.split())[:500]}
+            for ms, _, sql in sorted(profile["slowest"], reverse=True)
+        ]
+        record = {
+            "route": route,
+            "path": path,
+            "status": status,
+            "queries": profile["queries"],
+            "db_ms": round(profile["db_ms"], 3),
+            "total_ms": round(total_ms, 3),
+            "slowest": slowest,
+        }
+        slow = any(s["ms"] >= self.slow_ms for s in slowest)
+        logger.log(logging.WARNING if slow else logging.INFO, json.dumps(record))
+
+        with self._lock:
+            hists = self.routes.setdefault(route, {
+                "latency_ms": Histogram(LATENCY_BUCKETS_MS),
+                "db_ms": Histogram(LATENCY_BUCKETS_MS),
+                "queries": Histogram(QUERY_BUCKETS),
+            })
+            hists["latency_ms"].observe(total_ms)
+            hists["db_ms"].observe(profile["db_ms"])
+            hists["queries"].observe(profile["queries"])
+        return total_ms
+
+    def metrics_view(self):
+        sent = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(sent.encode(), f"Bearer {self.metrics_token}".encode()):
+            abort(403)
+        with self._lock:
+            routes = {route: {k: h.to_dict() for k, h in hists.items()} for route, hists in self.routes.items()}
+        return jsonify({"sample_rate": self.sample_rate, "routes": routes})
@@ -0,0 +1,281 @@
+# jobs.py
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import or_, select, update
+from db import db, upsert_insert
+from models import Session, Job, JOB_QUEUED
+from cache import invalidate
+import chemistry
+import leaderboard
+import mvp
+import ratings
+import rollups
+from stats import rebuild_user_stats
+
+logger = logging.getLogger("offthepost.jobs")
+
+# kind -> handler(**payload); a handler returns the cache tags to invalidate (or None)
+HANDLERS = {}
+
+
+def job(kind):
+    """Register a handler for `kind`.
+
+    Handlers run inside the worker's transaction and must not commit: the
+    job is marked done in the same commit, so a crash never leaves work
+    applied but the job still queued.
+    """
+    def decorator(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return decorator
+
+
+def enqueue(kind, payload=None, dedupe_key=None, run_at=None):
+    """Queue a job in the caller's transaction (it is only visible once they commit).
+
+    While a job with the same `dedupe_key` is still queued, enqueueing
+    another is a no-op, so e.g. one refresh per session is ever pending.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind {kind!r}")
+    insert = upsert_insert()
+    stmt = insert(Job).values(
+        kind=kind,
+        payload=payload or {},
+        dedupe_key=dedupe_key,
+        status="queued",
+        attempts=0,
+        max_attempts=current_app.config["JOB_MAX_ATTEMPTS"],
+        run_at=run_at or datetime.utcnow(),
+        created_at=datetime.utcnow(),
+    )
+    if dedupe_key is not None:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[Job.dedupe_key], index_where=JOB_QUEUED)
+    db.session.execute(stmt)
+    runner = current_app.extensions.get("job_runner")
+    if runner is not None:
+        runner.wake()
+
+
+def claim_next(worker_id, lease):
+    """Atomically take the next due job, or None.
+
+    A running job whose lease has expired (its worker died) is taken over,
+    which is how queued work survives restarts.
+    """
+    now = datetime.utcnow()
+    candidate = (
+        select(Job.id)
+        .where(or_(
+            (Job.status == "queued") & (Job.run_at <= now),
+            (Job.status == "running") & (Job.locked_at < now - timedelta(seconds=lease)),
+        ))
+        .order_by(Job.run_at, Job.id)
+        .limit(1)
+    )
+    if db.session.get_bind().dialect.name == "postgresql":
+        candidate = candidate.with_for_update(skip_locked=True)
+    stmt = (
+        update(Job)
+        .where(Job.id == candidate.scalar_subquery())
+        .values(status="running", locked_by=worker_id, locked_at=now, attempts=Job.attempts + 1)
+        .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts)
+    )
+    row = db.session.execute(stmt).first()
+    db.session.commit()
+    return row
+
+
+def backoff(attempts):
+    base = current_app.config["JOB_BACKOFF_SECONDS"]
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 3600))
+
+
+def run_one(worker_id):
+    """Claim and run one job. Returns False when nothing was due."""
+    claimed = claim_next(worker_id, current_app.config["JOB_LEASE_SECONDS"])
+    if claimed is None:
+        return False
+    job_id, kind, payload, attempts, max_attempts = claimed
+    started = time.perf_counter()
+    try:
+        tags = HANDLERS[kind](**payload)
+        db.session.execute(
+            update(Job).where(Job.id == job_id)
+            .values(status="done", finished_at=datetime.utcnow(), last_error=None)
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        error = traceback.format_exc(limit=5)
+        retry = attempts < max_attempts
+        db.session.execute(
+            update(Job).where(Job.id == job_id).values(
+                status="queued" if retry else "failed",
+                run_at=datetime.utcnow() + backoff(attempts) if retry else Job.run_at,
+                finished_at=None if retry else datetime.utcnow(),
+                last_error=error[-4000:],
+            )
+        )
+        db.session.commit()
+        logger.warning("job %s (%s) failed, attempt %s/%s%s", job_id, kind, attempts, max_attempts,
+                       "; will retry" if retry else "; giving up", exc_info=True)
+        return True
+    invalidate(*(tags or ()))
+    logger.info("job %s (%s) done in %.1fms", job_id, kind, (time.perf_counter() - started) * 1000)
+    return True
+
+
+class JobRunner:
+    """Worker threads draining the persistent jobs table.
+
+    With JOB_WORKERS > 0 the web process starts that many daemon threads
+    on its first request. For dedicated workers set JOB_WORKERS=0 on the
+    web app and run `flask run-jobs`; any number of processes can share
+    the table. Workers poll every JOB_POLL_SECONDS and are woken at once
+    by jobs enqueued in the same process.
+    """
+
+    def __init__(self, app=None):
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._started = False
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("JOB_WORKERS", 1)
+        app.config.setdefault("JOB_POLL_SECONDS", 1.0)
+        app.config.setdefault("JOB_LEASE_SECONDS", 300)
+        app.config.setdefault("JOB_MAX_ATTEMPTS", 5)
+        app.config.setdefault("JOB_BACKOFF_SECONDS", 5)
+        app.config.setdefault("MVP_FINALIZE_EVERY", 300)
+        self.app = app
+        app.extensions["job_runner"] = self
+        if app.config["JOB_WORKERS"] > 0:
+            app.before_request(self._start_once)
+
+    def _start_once(self):
+        if not self._started:
+            self.start(self.app.config["JOB_WORKERS"])
+
+    def start(self, n):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        with self.app.app_context():
+            schedule_periodic()
+            db.session.commit()
+        for i in range(n):
+            t = threading.Thread(target=self._loop, args=(i,), name=f"otp-jobs-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def _loop(self, i):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}:{i}"
+        poll = self.app.config["JOB_POLL_SECONDS"]
+        while not self._stop.is_set():
+            try:
+                with self.app.app_context():
+                    busy = run_one(worker_id)
+            except Exception:
+                logger.exception("job worker %s crashed; restarting loop", worker_id)
+                busy = False
+            if not busy:
+                self._wakeup.wait(poll)
+                self._wakeup.clear()
+
+    def join(self):
+        for t in self._threads:
+            t.join()
+
+
+# --- Handlers ---
+
+@job("apply_completed_session")
+def apply_completed_session_job(session_id):
+    session = db.session.get(Session, session_id)
+    leaderboard.apply_completed_session(session)
+    players = chemistry.apply_completed_session(session)
+    played = rollups.apply_completed_session(session)
+    return [
+        "leaderboard", f"leaderboard:{session.group_id}", f"group-timeline:{session.group_id}",
+        *(f"chemistry:{u_id}" for u_id in players),
+        *(f"user-timeline:{u_id}" for u_id in played),
+    ]
+
+
+# The rebuilds commit on their own; they are idempotent, so a retry is harmless
+
+@job("rebuild_stats")
+def rebuild_stats_job():
+    rebuild_user_stats()
+    current_app.extensions["response_cache"].clear()
+
+
+@job("rebuild_leaderboards")
+def rebuild_leaderboards_job():
+    leaderboard.rebuild_leaderboards()
+    current_app.extensions["response_cache"].clear()
+
+
+@job("rebuild_chemistry")
+def rebuild_chemistry_job():
+    chemistry.rebuild_chemistry()
+    current_app.extensions["response_cache"].clear()
+
+
+@job("rate_sessions")
+def rate_sessions_job():
+    """Rate completed sessions in completion order, a batch per run."""
+    batch_size = 500
+    pending = ratings.pending_sessions(limit=batch_size)
+    rated = ratings.rate_sessions(pending)
+    if len(pending) == batch_size:
+        enqueue("rate_sessions", dedupe_key="rate_sessions")
+    return [f"rating:{u_id}" for u_id in rated]
+
+
+@job("rebuild_ratings")
+def rebuild_ratings_job():
+    ratings.rebuild_ratings()
+    current_app.extensions["response_cache"].clear()
+
+
+@job("rebuild_rollups")
+def rebuild_rollups_job():
+    rollups.rebuild_rollups()
+    current_app.extensions["response_cache"].clear()
+
+
+@job("finalize_mvp")
+def finalize_mvp_job():
+    """Finalize closed MVP windows, then book the next run (a persistent periodic job)."""
+    batch_size = 500
+    due = mvp.due_sessions(limit=batch_size)
+    won = mvp.finalize_sessions(due)
+    # A full batch means more are waiting: go again straight away
+    schedule_periodic(delay=0 if len(due) == batch_size else current_app.config["MVP_FINALIZE_EVERY"])
+    return [f"user:{u_id}" for u_id in won]
+
+
+def schedule_periodic(delay=0):
+    """Make sure the recurring jobs have a queued run (deduped, so safe to call often)."""
+    enqueue("finalize_mvp", dedupe_key="finalize_mvp", run_at=datetime.utcnow() + timedelta(seconds=delay))
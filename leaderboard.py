@@ -0,0 +1,171 @@
+# leaderboard.py
+from collections import defaultdict
+from sqlalchemy import func
+from db import db, upsert_insert
+from models import User, Session, SessionTeam, SessionTeamMembership, Goal, MvpVote, LeaderboardEntry
+
+GLOBAL_SCOPE = 0
+METRICS = ("goals", "assists", "mvp_votes", "win_rate")
+COUNTERS = ("goals", "assists", "mvp_votes", "games", "wins")
+
+
+def periods_for(start_time):
+    """Periods a session counts towards: all-time, its season (year) and its month."""
+    return ("all", f"{start_time.year:04d}", f"{start_time.year:04d}-{start_time.month:02d}")
+
+
+def _session_facts(session_ids=None, votes=True):
+    """Per (session_id, user_id) counters for completed sessions, from grouped queries.
+
+    With `session_ids` only those sessions are read; otherwise every completed one.
+    votes=False leaves MVP votes out.
+    """
+    facts = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+
+    def scoped(query, session_col):
+        query = query.join(Session, Session.id == session_col).filter(Session.completed_at.isnot(None))
+        if session_ids is not None:
+            query = query.filter(session_col.in_(session_ids))
+        return query
+
+    goals = scoped(db.session.query(Goal.session_id, Goal.scorer_id, func.count(Goal.id)), Goal.session_id)
+    for s_id, u_id, n in goals.group_by(Goal.session_id, Goal.scorer_id):
+        facts[(s_id, u_id)]["goals"] = n
+
+    assists = scoped(db.session.query(Goal.session_id, Goal.assist_id, func.count(Goal.id)), Goal.session_id)
+    for s_id, u_id, n in assists.filter(Goal.assist_id.isnot(None)).group_by(Goal.session_id, Goal.assist_id):
+        facts[(s_id, u_id)]["assists"] = n
+
+    if votes:
+        vote_counts = scoped(db.session.query(MvpVote.session_id, MvpVote.voted_for_id, func.count(MvpVote.id)), MvpVote.session_id)
+        for s_id, u_id, n in vote_counts.group_by(MvpVote.session_id, MvpVote.voted_for_id):
+            facts[(s_id, u_id)]["mvp_votes"] = n
+
+    # Team scores -> winning team per session (a draw has no winner)
+    team_goals = scoped(
+        db.session.query(SessionTeam.session_id, SessionTeam.id, func.count(Goal.id))
+        .outerjoin(Goal, Goal.team_id == SessionTeam.id),
+        SessionTeam.session_id,
+    ).group_by(SessionTeam.session_id, SessionTeam.id)
+    scores = defaultdict(list)
+    for s_id, t_id, n in team_goals:
+        scores[s_id].append((n, t_id))
+    winners = set()
+    for s_id, teams in scores.items():
+        teams.sort(reverse=True)
+        if len(teams) > 1 and teams[0][0] > teams[1][0]:
+            winners.add(teams[0][1])
+
+    roster = scoped(
+        db.session.query(SessionTeam.session_id, SessionTeamMembership.user_id, SessionTeam.id)
+        .join(SessionTeamMembership, SessionTeamMembership.session_team_id == SessionTeam.id),
+        SessionTeam.session_id,
+    )
+    for s_id, u_id, t_id in roster:
+        f = facts[(s_id, u_id)]
+        f["games"] = 1
+        if t_id in winners:
+            f["wins"] = 1
+
+    return facts
+
+
+def _accumulate(facts):
+    """Fold session facts into {(group_id, period, user_id): counters}."""
+    session_ids = {s_id for s_id, _ in facts}
+    sessions = {
+        s_id: (group_id, start_time)
+        for s_id, group_id, start_time in db.session.query(Session.id, Session.group_id, Session.start_time)
+        .filter(Session.id.in_(session_ids))
+    } if session_ids else {}
+
+    totals = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for (s_id, u_id), f in facts.items():
+        group_id, start_time = sessions[s_id]
+        for scope in (group_id, GLOBAL_SCOPE):
+            for period in periods_for(start_time):
+                t = totals[(scope, period, u_id)]
+                for k in COUNTERS:
+                    t[k] += f[k]
+    return totals
+
+
+def _rows(totals):
+    return [
+        {"group_id": g, "period": p, "user_id": u, **t, "win_rate": t["wins"] / t["games"] if t["games"] else 0.0}
+        for (g, p, u), t in totals.items()
+    ]
+
+
+def _upsert(rows):
+    if not rows:
+        return
+    insert = upsert_insert()
+    stmt = insert(LeaderboardEntry)
+    games = LeaderboardEntry.games + stmt.excluded.games
+    wins = LeaderboardEntry.wins + stmt.excluded.wins
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LeaderboardEntry.group_id, LeaderboardEntry.period, LeaderboardEntry.user_id],
+        set_={
+            **{k: getattr(LeaderboardEntry, k) + getattr(stmt.excluded, k) for k in COUNTERS},
+            "win_rate": func.coalesce(func.cast(wins, db.Float) / func.nullif(games, 0), 0.0),
+        },
+    )
+    db.session.execute(stmt, rows)
+
+
+def apply_completed_session(session):
+    """Add one newly completed session to every board it belongs to.
+
+    Costs O(players in the session); call once per session. It may run
+    after completion (as a job), by which time votes can already have
+    been counted through apply_mvp_votes, so votes are left out here.
+    """
+    _upsert(_rows(_accumulate(_session_facts([session.id], votes=False))))
+
+
+def apply_mvp_votes(session, counts):
+    """Count MVP votes cast after completion; `counts` is {voted_for_id: n}."""
+    if session.completed_at is None or not counts:
+        return
+    rows = []
+    for u_id, n in counts.items():
+        for scope in (session.group_id, GLOBAL_SCOPE):
+            for period in periods_for(session.start_time):
+                rows.append({"group_id": scope, "period": period, "user_id": u_id,
+                             **dict.fromkeys(COUNTERS, 0), "mvp_votes": n, "win_rate": 0.0})
+    _upsert(rows)
+
+
+def rebuild_leaderboards():
+    """Recompute every board from completed sessions."""
+    rows = _rows(_accumulate(_session_facts()))
+    db.session.query(LeaderboardEntry).delete()
+    if rows:
+        db.session.execute(LeaderboardEntry.__table__.insert(), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def read_leaderboard(group_id, metric, period, limit, offset, min_games=1):
+    """One page of a board, ranked by `metric` — an index range scan of `limit` rows."""
+    column = getattr(LeaderboardEntry, metric)
+    query = (
+        db.session.query(LeaderboardEntry, User.name)
+        .join(User, User.id == LeaderboardEntry.user_id)
+        .filter(LeaderboardEntry.group_id == group_id, LeaderboardEntry.period == period)
+    )
+    if metric == "win_rate":
+        query = query.filter(LeaderboardEntry.games >= min_games)
+    rows = query.order_by(column.desc(), LeaderboardEntry.user_id).offset(offset).limit(limit)
+    return [{
+        "rank": offset + i + 1,
+        "user_id": e.user_id,
+        "name": name,
+        "goals": e.goals,
+        "assists": e.assists,
+        "mvp_votes": e.mvp_votes,
+        "games": e.games,
+        "wins": e.wins,
+        "win_rate": round(e.win_rate, 3),
+    } for i, (e, name) in enumerate(rows)]
@@ -0,0 +1,63 @@
+"""Add user search index (FTS5 on SQLite, trigram GIN on PostgreSQL)
+
+Revision ID: 3a8d5e1c7b90
+Revises: fa7efc26fdfe
+Create Date: 2026-10-17 16:42:05.613207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a8d5e1c7b90'
+down_revision = 'fa7efc26fdfe'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_UPGRADE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        name, nickname, fav_team,
+        content='users', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, name, nickname, fav_team)
+        VALUES (new.id, new.name, new.nickname, new.fav_team);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, name, nickname, fav_team)
+        VALUES ('delete', old.id, old.name, old.nickname, old.fav_team);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF name, nickname, fav_team ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, name, nickname, fav_team)
+        VALUES ('delete', old.id, old.name, old.nickname, old.fav_team);
+        INSERT INTO users_fts(rowid, name, nickname, fav_team)
+        VALUES (new.id, new.name, new.nickname, new.fav_team);
+    END""",
+    # Index the users that already exist
+    "INSERT INTO users_fts(users_fts) VALUES ('rebuild')",
+]
+
+POSTGRES_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """CREATE INDEX IF NOT EXISTS ix_users_search_trgm ON users
+        USING gin ((concat_ws(' ', name, nickname, fav_team)) gin_trgm_ops)""",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    for statement in {"sqlite": SQLITE_UPGRADE, "postgresql": POSTGRES_UPGRADE}.get(dialect, []):
+        op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for trigger in ("users_fts_au", "users_fts_ad", "users_fts_ai"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS users_fts")
+    elif dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_users_search_trgm")
@@ -1,6 +1,6 @@
 # models.py
 from datetime import datetime
-from sqlalchemy import UniqueConstraint, CheckConstraint
+from sqlalchemy import UniqueConstraint, CheckConstraint, text
 from db import db
 
 # --- Association: Users <-> Groups ---
@@ -11,7 +11,10 @@ class GroupMembership(db.Model):
     group_id = db.Column(db.Integer, db.ForeignKey("groups.id"), nullable=False)
     joined_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-    __table_args__ = (UniqueConstraint("user_id", "group_id", name="uq_user_group"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "group_id", name="uq_user_group"),
+        db.Index("ix_group_memberships_group_id", "group_id"),
+    )
 
 
 # --- Core: Users ---
@@ -65,8 +68,9 @@ class User(db.Model):
 
     @property
     def mvp_wins_count(self):
-        """Total MVP wins by the user."""
-        return len(self.mvp_votes_received)
+        """Total MVP wins by the user (sessions finalized with them on top)."""
+        stats = db.session.get(UserStats, self.id)
+        return stats.mvp_wins if stats else 0
 
     def __repr__(self):
         return f"<User {self.name}>"
@@ -112,6 +116,17 @@ class Session(db.Model):
     start_time = db.Column(db.DateTime, nullable=False)   # scheduled kick-off
     completed_at = db.Column(db.DateTime, nullable=True)  # when session marked complete (opens MVP voting window)
 
+    # Final score, stored on completion. Not a foreign key, which would make
+    # sessions and session_teams depend on each other.
+    winner_team_id = db.Column(db.Integer, nullable=True)  # None on a draw
+    result = db.Column(db.JSON, nullable=True)             # scoreboard snapshot
+
+    # Set once the MVP voting window has closed and the winners are in mvp_results
+    mvp_finalized_at = db.Column(db.DateTime, nullable=True)
+
+    # Set once the result has been applied to player ratings (see ratings.py)
+    rated_at = db.Column(db.DateTime, nullable=True)
+
     # Teams in this session (flexible number)
     teams = db.relationship("SessionTeam", backref="session", cascade="all, delete-orphan")
 
@@ -121,6 +136,15 @@ class Session(db.Model):
     # MVP votes for this session
     mvp_votes = db.relationship("MvpVote", backref="session", cascade="all, delete-orphan")
 
+    # A group's sessions are always read newest/oldest first
+    __table_args__ = (
+        db.Index("ix_sessions_group_id_start_time", "group_id", "start_time"),
+        # Sessions whose voting window is due to be finalized
+        db.Index("ix_sessions_mvp_pending", "mvp_finalized_at", "completed_at"),
+        # Completed sessions still to be rated, in completion order
+        db.Index("ix_sessions_rating_pending", "rated_at", "completed_at"),
+    )
+
     def __repr__(self):
         return f"<Session {self.id} Group={self.group_id} {self.start_time}>"
 
@@ -158,7 +182,12 @@ class SessionTeamMembership(db.Model):
     session_team_id = db.Column(db.Integer, db.ForeignKey("session_teams.id"), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
 
-    __table_args__ = (UniqueConstraint("session_team_id", "user_id", name="uq_player_once_per_team"),)
+    # (user_id, session_team_id) covers "teams this player played for" without a table lookup;
+    # session_team_id lookups use the unique constraint's index
+    __table_args__ = (
+        UniqueConstraint("session_team_id", "user_id", name="uq_player_once_per_team"),
+        db.Index("ix_session_team_memberships_user_id", "user_id", "session_team_id"),
+    )
 
     def __repr__(self):
         return f"<SessionTeamMembership Team={self.session_team_id} User={self.user_id}>"
@@ -184,6 +213,10 @@ class Goal(db.Model):
     # Prevent self-assist if you want (business rule — here as a soft check)
     __table_args__ = (
         CheckConstraint("assist_id IS NULL OR assist_id != scorer_id", name="ck_no_self_assist"),
+        db.Index("ix_goals_session_id_scorer_id", "session_id", "scorer_id"),
+        db.Index("ix_goals_team_id", "team_id"),
+        db.Index("ix_goals_scorer_id", "scorer_id"),
+        db.Index("ix_goals_assist_id", "assist_id"),
     )
 
     def __repr__(self):
@@ -204,7 +237,203 @@ class MvpVote(db.Model):
     __table_args__ = (
         UniqueConstraint("session_id", "voter_id", name="uq_one_vote_per_session"),
         CheckConstraint("voter_id != voted_for_id", name="ck_no_self_vote"),
+        db.Index("ix_mvp_votes_voted_for_id_session_id", "voted_for_id", "session_id"),
     )
 
     def __repr__(self):
         return f"<MvpVote Session={self.session_id} Voter={self.voter_id} For={self.voted_for_id}>"
+
+
+# --- MvpTally: running vote count per candidate while a session's window is open ---
+class MvpTally(db.Model):
+    __tablename__ = "mvp_tallies"
+    session_id = db.Column(db.Integer, db.ForeignKey("sessions.id"), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    votes = db.Column(db.Integer, nullable=False, default=0)
+
+    # Standings are read straight off this index, highest first
+    __table_args__ = (
+        db.Index("ix_mvp_tallies_session_id_votes", "session_id", "votes"),
+    )
+
+    def __repr__(self):
+        return f"<MvpTally Session={self.session_id} User={self.user_id} Votes={self.votes}>"
+
+
+# --- MvpResult: the winner(s) of a session's vote, written when its window closes ---
+class MvpResult(db.Model):
+    __tablename__ = "mvp_results"
+    session_id = db.Column(db.Integer, db.ForeignKey("sessions.id"), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)  # ties share the award
+    votes = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_mvp_results_user_id", "user_id"),
+    )
+
+    def __repr__(self):
+        return f"<MvpResult Session={self.session_id} User={self.user_id} Votes={self.votes}>"
+
+
+# --- UserStats: denormalized per-user counters (kept in step with writes) ---
+class UserStats(db.Model):
+    __tablename__ = "user_stats"
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+
+    goals = db.Column(db.Integer, nullable=False, default=0)
+    assists = db.Column(db.Integer, nullable=False, default=0)
+    mvp_votes_received = db.Column(db.Integer, nullable=False, default=0)
+    mvp_wins = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    sessions_played = db.Column(db.Integer, nullable=False, default=0)
+    teams_played = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<UserStats User={self.user_id} Goals={self.goals} Assists={self.assists}>"
+
+
+# --- LeaderboardEntry: precomputed per-player totals per scope & period ---
+class LeaderboardEntry(db.Model):
+    __tablename__ = "leaderboard_entries"
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Not a foreign key: 0 is the global (all groups) board
+    group_id = db.Column(db.Integer, nullable=False)
+    # "all", a season ("2025") or a month ("2025-08")
+    period = db.Column(db.String(7), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user = db.relationship("User")
+
+    goals = db.Column(db.Integer, nullable=False, default=0)
+    assists = db.Column(db.Integer, nullable=False, default=0)
+    mvp_votes = db.Column(db.Integer, nullable=False, default=0)
+    games = db.Column(db.Integer, nullable=False, default=0)
+    wins = db.Column(db.Integer, nullable=False, default=0)
+    win_rate = db.Column(db.Float, nullable=False, default=0.0)
+
+    # One index per ranking so a page read is an index range scan
+    __table_args__ = (
+        UniqueConstraint("group_id", "period", "user_id", name="uq_leaderboard_entry"),
+        db.Index("ix_leaderboard_goals", "group_id", "period", "goals"),
+        db.Index("ix_leaderboard_assists", "group_id", "period", "assists"),
+        db.Index("ix_leaderboard_mvp_votes", "group_id", "period", "mvp_votes"),
+        db.Index("ix_leaderboard_win_rate", "group_id", "period", "win_rate"),
+    )
+
+    def __repr__(self):
+        return f"<LeaderboardEntry Group={self.group_id} {self.period} User={self.user_id}>"
+
+
+# --- StatRollup: per-user and per-group totals by day, week and month (see rollups.py) ---
+class StatRollup(db.Model):
+    __tablename__ = "stat_rollups"
+    id = db.Column(db.Integer, primary_key=True)
+
+    # "user" or "group"; not a foreign key as it points at either table
+    entity = db.Column(db.String(5), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    bucket = db.Column(db.String(5), nullable=False)  # "day", "week" or "month"
+    period_start = db.Column(db.Date, nullable=False)  # the day, the week's Monday, the month's 1st
+
+    goals = db.Column(db.Integer, nullable=False, default=0)
+    assists = db.Column(db.Integer, nullable=False, default=0)
+    mvp_votes = db.Column(db.Integer, nullable=False, default=0)
+    games = db.Column(db.Integer, nullable=False, default=0)  # a group's sessions
+    wins = db.Column(db.Integer, nullable=False, default=0)
+
+    # Also the index a timeline read scans
+    __table_args__ = (
+        UniqueConstraint("entity", "entity_id", "bucket", "period_start", name="uq_stat_rollup"),
+    )
+
+    def __repr__(self):
+        return f"<StatRollup {self.entity}={self.entity_id} {self.bucket} {self.period_start}>"
+
+
+# --- PairStats: per-group chemistry between two players (see chemistry.py) ---
+class PairStats(db.Model):
+    __tablename__ = "pair_stats"
+    id = db.Column(db.Integer, primary_key=True)
+
+    group_id = db.Column(db.Integer, db.ForeignKey("groups.id"), nullable=False)
+    # One row per ordered pair: counters read from user_id's side
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    other_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+
+    assists = db.Column(db.Integer, nullable=False, default=0)  # user assisted other's goals
+    assisted_by = db.Column(db.Integer, nullable=False, default=0)  # other assisted user's goals
+    together = db.Column(db.Integer, nullable=False, default=0)  # sessions on the same team
+    wins_together = db.Column(db.Integer, nullable=False, default=0)
+    against = db.Column(db.Integer, nullable=False, default=0)  # sessions on opposing teams
+    wins_against = db.Column(db.Integer, nullable=False, default=0)  # ... that user's team won
+
+    __table_args__ = (
+        UniqueConstraint("group_id", "user_id", "other_id", name="uq_pair_stats"),
+        db.Index("ix_pair_stats_user_id_group_id", "user_id", "group_id"),
+    )
+
+    def __repr__(self):
+        return f"<PairStats Group={self.group_id} User={self.user_id} Other={self.other_id}>"
+
+
+# --- UserRating: current Elo rating per player (see ratings.py) ---
+class UserRating(db.Model):
+    __tablename__ = "user_ratings"
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    rating = db.Column(db.Float, nullable=False)
+    games = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<UserRating User={self.user_id} Rating={self.rating:.0f}>"
+
+
+# --- RatingHistory: a player's rating after each rated session ---
+class RatingHistory(db.Model):
+    __tablename__ = "rating_history"
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
+    session_id = db.Column(db.Integer, db.ForeignKey("sessions.id"), primary_key=True)
+    rating = db.Column(db.Float, nullable=False)
+    delta = db.Column(db.Float, nullable=False)
+    rated_at = db.Column(db.DateTime, nullable=False)  # the session's completed_at
+
+    __table_args__ = (
+        db.Index("ix_rating_history_user_id_rated_at", "user_id", "rated_at"),
+    )
+
+    def __repr__(self):
+        return f"<RatingHistory User={self.user_id} Session={self.session_id} Rating={self.rating:.0f}>"
+
+
+# --- Jobs: persistent queue for deferred work (see jobs.py) ---
+JOB_QUEUED = text("status = 'queued'")
+
+
+class Job(db.Model):
+    __tablename__ = "jobs"
+    id = db.Column(db.Integer, primary_key=True)
+
+    kind = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    # At most one queued job per key, e.g. one leaderboard refresh per session
+    dedupe_key = db.Column(db.String(128), nullable=True)
+
+    status = db.Column(db.String(16), nullable=False, default="queued")  # queued / running / done / failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # not before (backoff)
+
+    locked_by = db.Column(db.String(128), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # Workers claim the oldest due job off this index
+        db.Index("ix_jobs_status_run_at", "status", "run_at"),
+        db.Index("uq_jobs_queued_dedupe_key", "dedupe_key", unique=True,
+                 sqlite_where=JOB_QUEUED, postgresql_where=JOB_QUEUED),
+    )
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.kind} {self.status}>"
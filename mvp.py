@@ -0,0 +1,222 @@
+# mvp.py
+from collections import defaultdict
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import func, update
+from db import db, upsert_insert
+from models import User, Session, SessionTeam, SessionTeamMembership, MvpVote, MvpTally, MvpResult
+from stats import bump_many_user_stats
+
+
+def voting_window():
+    return current_app.config["MVP_VOTING_WINDOW"]
+
+
+def voting_closes_at(session):
+    return session.completed_at + voting_window() if session.completed_at else None
+
+
+def voting_status(session, now=None):
+    """"not_started" (session still in play), "open", "closed" (awaiting finalization) or "final"."""
+    if session.completed_at is None:
+        return "not_started"
+    if session.mvp_finalized_at is not None:
+        return "final"
+    return "open" if (now or datetime.utcnow()) <= voting_closes_at(session) else "closed"
+
+
+def session_players(session_id):
+    """Ids of everyone on a team in the session (the only eligible voters and candidates)."""
+    return {
+        u_id for (u_id,) in
+        db.session.query(SessionTeamMembership.user_id)
+        .join(SessionTeam, SessionTeam.id == SessionTeamMembership.session_team_id)
+        .filter(SessionTeam.session_id == session_id)
+    }
+
+
+def window_error(session):
+    """Why the session is not taking votes right now, or None."""
+    status = voting_status(session)
+    if status == "not_started":
+        return "voting opens when the session is completed"
+    if status != "open":
+        return "voting window has closed"
+    return None
+
+
+def eligibility_error(voter_id, voted_for_id, players):
+    """Why this pair may not vote, or None. `players` is session_players(session.id)."""
+    if voter_id not in players:
+        return f"user {voter_id} did not play in this session"
+    if voted_for_id not in players:
+        return f"user {voted_for_id} did not play in this session"
+    return None
+
+
+def has_voted(session_id, voter_id):
+    """Whether `voter_id` already voted in the session (one vote each)."""
+    return db.session.query(
+        db.session.query(MvpVote.id).filter_by(session_id=session_id, voter_id=voter_id).exists()
+    ).scalar()
+
+
+# --- Live tally ---
+
+def add_to_tally(session_id, counts):
+    """Add votes, `counts` being {voted_for_id: n}, to the session's running tally."""
+    if not counts:
+        return
+    insert = upsert_insert()
+    stmt = insert(MvpTally)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MvpTally.session_id, MvpTally.user_id],
+        set_={"votes": MvpTally.votes + stmt.excluded.votes},
+    )
+    db.session.execute(stmt, [{"session_id": session_id, "user_id": u_id, "votes": n} for u_id, n in counts.items()])
+
+
+def standings(session_id, limit=10):
+    """Top of the running tally, [(user_id, name, votes)] — an index range scan."""
+    return (
+        db.session.query(MvpTally.user_id, User.name, MvpTally.votes)
+        .join(User, User.id == MvpTally.user_id)
+        .filter(MvpTally.session_id == session_id)
+        .order_by(MvpTally.votes.desc(), MvpTally.user_id)
+        .limit(limit)
+        .all()
+    )
+
+
+def session_winners(session_id):
+    return (
+        db.session.query(MvpResult.user_id, User.name, MvpResult.votes)
+        .join(User, User.id == MvpResult.user_id)
+        .filter(MvpResult.session_id == session_id)
+        .order_by(MvpResult.user_id)
+        .all()
+    )
+
+
+def mvp_summary(session, limit=10):
+    """Voting status, current standings and, once finalized, the winner(s)."""
+    status = voting_status(session)
+    closes_at = voting_closes_at(session)
+    return {
+        "session_id": session.id,
+        "status": status,
+        "closes_at": closes_at.isoformat() if closes_at else None,
+        "standings": [{"user_id": u, "name": n, "votes": v} for u, n, v in standings(session.id, limit)],
+        "winners": [{"user_id": u, "name": n, "votes": v} for u, n, v in session_winners(session.id)] if status == "final" else [],
+    }
+
+
+# --- Finalization ---
+
+def _top_voted(tally_rows):
+    """mvp_results rows from (session_id, user_id, votes): the most-voted per session, ties included."""
+    top = defaultdict(list)
+    for s_id, u_id, votes in tally_rows:
+        best = top[s_id]
+        if votes <= 0 or (best and votes < best[0]["votes"]):
+            continue
+        if best and votes > best[0]["votes"]:
+            best.clear()
+        best.append({"session_id": s_id, "user_id": u_id, "votes": votes})
+    return [r for best in top.values() for r in best]
+
+
+def due_sessions(now=None, limit=500):
+    """Completed sessions whose voting window has closed but that are not finalized yet."""
+    cutoff = (now or datetime.utcnow()) - voting_window()
+    return (
+        Session.query
+        .filter(Session.mvp_finalized_at.is_(None), Session.completed_at.isnot(None), Session.completed_at <= cutoff)
+        .order_by(Session.completed_at)
+        .limit(limit)
+        .all()
+    )
+
+
+def finalize_sessions(sessions):
+    """Write the MVP winner(s) of each session to mvp_results and count the wins.
+
+    Each session is claimed first (mvp_finalized_at set where it is still
+    NULL), so when a GET and the finalize_mvp job race, only the run that
+    claimed a session writes its results. Reads the tallies of every
+    claimed session in one query. Ties share the award; a session with no
+    votes has no winner. Returns the ids of the winners.
+    """
+    if not sessions:
+        return set()
+    claimed = [
+        s_id for (s_id,) in db.session.execute(
+            update(Session)
+            .where(Session.id.in_([s.id for s in sessions]), Session.mvp_finalized_at.is_(None))
+            .values(mvp_finalized_at=datetime.utcnow())
+            .returning(Session.id)
+        )
+    ]
+    if not claimed:
+        return set()
+    rows = _top_voted(
+        db.session.query(MvpTally.session_id, MvpTally.user_id, MvpTally.votes)
+        .filter(MvpTally.session_id.in_(claimed))
+    )
+    if rows:
+        db.session.execute(MvpResult.__table__.insert(), rows)
+    wins = defaultdict(int)
+    for r in rows:
+        wins[r["user_id"]] += 1
+    bump_many_user_stats({u_id: {"mvp_wins": n} for u_id, n in wins.items()})
+    return set(wins)
+
+
+def finalize_due_sessions(now=None, batch_size=500):
+    """Finalize every session whose window has closed, a batch per transaction.
+
+    Returns (sessions finalized, ids of users who won).
+    """
+    n, won = 0, set()
+    while True:
+        batch = due_sessions(now, batch_size)
+        if not batch:
+            return n, won
+        won |= finalize_sessions(batch)
+        db.session.commit()
+        n += len(batch)
+
+
+# --- Full rebuild ---
+
+def rebuild_mvp(now=None):
+    """Recompute tallies from mvp_votes and re-finalize every closed window.
+
+    Leaves user_stats.mvp_wins to rebuild_user_stats, which counts mvp_results.
+    """
+    db.session.query(MvpResult).delete()
+    db.session.query(MvpTally).delete()
+    db.session.query(Session).filter(Session.mvp_finalized_at.isnot(None)).update(
+        {Session.mvp_finalized_at: None}, synchronize_session=False
+    )
+    tallies = (
+        db.session.query(MvpVote.session_id, MvpVote.voted_for_id, func.count(MvpVote.id))
+        .group_by(MvpVote.session_id, MvpVote.voted_for_id)
+        .all()
+    )
+    if tallies:
+        db.session.execute(
+            MvpTally.__table__.insert(),
+            [{"session_id": s_id, "user_id": u_id, "votes": n} for s_id, u_id, n in tallies],
+        )
+
+    # Finalize closed windows without touching user_stats (the caller rebuilds it)
+    cutoff = (now or datetime.utcnow()) - voting_window()
+    closed = db.session.query(Session).filter(Session.completed_at.isnot(None), Session.completed_at <= cutoff)
+    closed_ids = {s_id for (s_id,) in closed.with_entities(Session.id)}
+    results = _top_voted(t for t in tallies if t[0] in closed_ids)
+    if results:
+        db.session.execute(MvpResult.__table__.insert(), results)
+    closed.update({Session.mvp_finalized_at: datetime.utcnow()}, synchronize_session=False)
+    db.session.commit()
+    return len(results)
@@ -0,0 +1,44 @@
+# pagination.py
+from flask import abort, request
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def _int_arg(name, default):
+    value = request.args.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        abort(400, description=f"'{name}' must be an integer")
+
+
+def page_args():
+    """(limit, cursor) from ?limit= and ?cursor=, validated and clamped."""
+    limit = _int_arg("limit", DEFAULT_PAGE_SIZE)
+    if limit < 1:
+        abort(400, description="'limit' must be positive")
+    return min(limit, MAX_PAGE_SIZE), _int_arg("cursor", None)
+
+
+def trim_page(rows, limit):
+    """Drop the look-ahead row; returns (rows, next_cursor)."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1].id
+    return rows, None
+
+
+def keyset_page(query, id_column):
+    """Fetch one page of `query` ordered by `id_column` (keyset: id > cursor).
+
+    Reads ?limit= and ?cursor= from the request. Returns (rows, next_cursor);
+    next_cursor is None on the last page.
+    """
+    limit, cursor = page_args()
+    if cursor is not None:
+        query = query.filter(id_column > cursor)
+    # Fetch one extra row to know whether another page exists
+    return trim_page(query.order_by(id_column).limit(limit + 1).all(), limit)
@@ -0,0 +1,192 @@
+# ratings.py
+from datetime import datetime
+import numpy as np
+from sqlalchemy import update
+from db import db, upsert_insert
+from models import Session, SessionTeam, SessionTeamMembership, UserRating, RatingHistory
+
+# Elo over team results: a team's strength is its players' mean rating
+INITIAL_RATING = 1500.0
+SCALE = 400.0
+K_FACTOR = 24.0
+# Early games move a rating faster so newcomers find their level
+K_PROVISIONAL = 48.0
+PROVISIONAL_GAMES = 10
+
+
+def margin_multiplier(goal_difference):
+    """World Football Elo goal-margin weight: 1 for a one-goal game, 1.5 for two, (11 + n) / 8 above."""
+    gd = np.abs(goal_difference)
+    return np.where(gd <= 1, 1.0, np.where(gd == 2, 1.5, (11.0 + gd) / 8.0))
+
+
+def rating_deltas(team_of, ratings, games, team_goals):
+    """Rating change of each player in one session.
+
+    `team_of` maps each player to a team index, `ratings`/`games` are the
+    players' values before the session and `team_goals` the final score.
+    Every team plays every other: S is 1/0.5/0 for a win/draw/loss, E the
+    Elo expectation from mean ratings, and the player moves by
+    K * margin * (S - E), averaged over the opponents.
+    """
+    team_goals = np.asarray(team_goals, dtype=float)
+    n_teams = len(team_goals)
+    strength = np.bincount(team_of, weights=ratings, minlength=n_teams) / np.bincount(team_of, minlength=n_teams)
+    expected = 1.0 / (1.0 + 10.0 ** ((strength[None, :] - strength[:, None]) / SCALE))
+    diff = team_goals[:, None] - team_goals[None, :]
+    score = 0.5 + 0.5 * np.sign(diff)
+    # The diagonal (a team against itself) is 0.5 - 0.5 and adds nothing
+    team_delta = ((score - expected) * margin_multiplier(diff)).sum(axis=1) / (n_teams - 1)
+    k = np.where(games < PROVISIONAL_GAMES, K_PROVISIONAL, K_FACTOR)
+    return k * team_delta[team_of]
+
+
+def _rosters(session_ids=None):
+    """[(session_id, completed_at, [(team_id, goals, [user_ids])])] for completed sessions in completed_at order."""
+    query = (
+        db.session.query(Session.id, Session.completed_at, SessionTeam.id, SessionTeam.goals_for,
+                         SessionTeamMembership.user_id)
+        .join(SessionTeam, SessionTeam.session_id == Session.id)
+        .join(SessionTeamMembership, SessionTeamMembership.session_team_id == SessionTeam.id)
+        .filter(Session.completed_at.isnot(None))
+        .order_by(Session.completed_at, Session.id, SessionTeam.id, SessionTeamMembership.user_id)
+    )
+    if session_ids is not None:
+        query = query.filter(Session.id.in_(session_ids))
+    sessions = []
+    for s_id, completed_at, t_id, goals, u_id in query:
+        if not sessions or sessions[-1][0] != s_id:
+            sessions.append((s_id, completed_at, []))
+        teams = sessions[-1][2]
+        if not teams or teams[-1][0] != t_id:
+            teams.append((t_id, goals or 0, []))
+        teams[-1][2].append(u_id)
+    return sessions
+
+
+def _play(sessions, state):
+    """Replay `sessions` in order over `state` ({user_id: (rating, games)}, updated in place).
+
+    Returns the rating_history rows. Sessions with fewer than two teams
+    rate nobody; a player listed on two teams counts for the first.
+    """
+    history = []
+    for s_id, completed_at, teams in sessions:
+        if len(teams) < 2:
+            continue
+        seen, users, team_of = set(), [], []
+        for t, (_, _, members) in enumerate(teams):
+            for u_id in members:
+                if u_id not in seen:
+                    seen.add(u_id)
+                    users.append(u_id)
+                    team_of.append(t)
+        before = [state.get(u_id, (INITIAL_RATING, 0)) for u_id in users]
+        ratings = np.array([r for r, _ in before])
+        games = np.array([g for _, g in before])
+        after = ratings + rating_deltas(np.array(team_of), ratings, games, [goals for _, goals, _ in teams])
+        for u_id, new, old, g in zip(users, after.tolist(), ratings.tolist(), games.tolist()):
+            state[u_id] = (new, g + 1)
+            history.append({"user_id": u_id, "session_id": s_id, "rating": new, "delta": new - old,
+                            "rated_at": completed_at})
+    return history
+
+
+def pending_sessions(limit=500):
+    """Completed sessions not rated yet, oldest completion first."""
+    return [
+        s_id for (s_id,) in
+        db.session.query(Session.id)
+        .filter(Session.rated_at.is_(None), Session.completed_at.isnot(None))
+        .order_by(Session.completed_at, Session.id)
+        .limit(limit)
+    ]
+
+
+def rate_sessions(session_ids):
+    """Apply the given sessions' results to user_ratings, in completed_at order.
+
+    O(players) per session: only the players involved are read and written.
+    The sessions are claimed (rated_at set) first, so a concurrent run
+    fails and retries instead of rating them twice. Returns the ids of the
+    players rated. Call inside a transaction; the caller commits.
+    """
+    if not session_ids:
+        return set()
+    claimed = db.session.execute(
+        update(Session)
+        .where(Session.id.in_(session_ids), Session.rated_at.is_(None))
+        .values(rated_at=datetime.utcnow())
+    ).rowcount
+    if claimed != len(session_ids):
+        raise RuntimeError("sessions were rated concurrently")
+
+    sessions = _rosters(session_ids)
+    players = {u_id for _, _, teams in sessions for _, _, members in teams for u_id in members}
+    state = {
+        u_id: (rating, games) for u_id, rating, games in
+        db.session.query(UserRating.user_id, UserRating.rating, UserRating.games)
+        .filter(UserRating.user_id.in_(players))
+    }
+    history = _play(sessions, state)
+    if history:
+        db.session.execute(RatingHistory.__table__.insert(), history)
+        rated = {r["user_id"] for r in history}
+        insert = upsert_insert()
+        stmt = insert(UserRating)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserRating.user_id],
+            set_={"rating": stmt.excluded.rating, "games": stmt.excluded.games, "updated_at": stmt.excluded.updated_at},
+        )
+        now = datetime.utcnow()
+        db.session.execute(stmt, [
+            {"user_id": u_id, "rating": state[u_id][0], "games": state[u_id][1], "updated_at": now} for u_id in rated
+        ])
+        return rated
+    return set()
+
+
+def rebuild_ratings():
+    """Deterministic full replay of every completed session from the initial rating.
+
+    Reads all rosters in one query and rewrites user_ratings and
+    rating_history; the same arithmetic as rate_sessions, so the result
+    equals having rated each session as it completed.
+    """
+    db.session.query(RatingHistory).delete()
+    db.session.query(UserRating).delete()
+    state = {}
+    history = _play(_rosters(), state)
+    if history:
+        db.session.execute(RatingHistory.__table__.insert(), history)
+    now = datetime.utcnow()
+    if state:
+        db.session.execute(UserRating.__table__.insert(), [
+            {"user_id": u_id, "rating": r, "games": g, "updated_at": now} for u_id, (r, g) in state.items()
+        ])
+    db.session.query(Session).filter(Session.completed_at.isnot(None)).update(
+        {Session.rated_at: now}, synchronize_session=False
+    )
+    db.session.commit()
+    return len(state)
+
+
+def user_rating(user_id, limit=20):
+    """A player's current rating and their latest `limit` changes, newest first."""
+    row = db.session.get(UserRating, user_id)
+    history = (
+        db.session.query(RatingHistory.session_id, RatingHistory.rated_at, RatingHistory.rating, RatingHistory.delta)
+        .filter(RatingHistory.user_id == user_id)
+        .order_by(RatingHistory.rated_at.desc(), RatingHistory.session_id.desc())
+        .limit(limit)
+    )
+    return {
+        "user_id": user_id,
+        "rating": round(row.rating, 1) if row else INITIAL_RATING,
+        "games": row.games if row else 0,
+        "provisional": (row.games if row else 0) < PROVISIONAL_GAMES,
+        "history": [
+            {"session_id": s_id, "rated_at": rated_at.isoformat(), "rating": round(r, 1), "delta": round(d, 1)}
+            for s_id, rated_at, r, d in history
+        ],
+    }
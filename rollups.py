@@ -0,0 +1,146 @@
+# rollups.py
+from collections import defaultdict
+from datetime import datetime, timedelta
+from db import db, upsert_insert
+from models import Session, StatRollup
+from leaderboard import _session_facts
+
+BUCKETS = ("day", "week", "month")
+COUNTERS = ("goals", "assists", "mvp_votes", "games", "wins")
+# Fields a timeline point carries; a group's "games" counts its sessions
+FIELDS = {"user": COUNTERS, "group": ("goals", "assists", "mvp_votes", "games")}
+# Default span of a timeline when ?from= is not given
+DEFAULT_SPAN = {"day": timedelta(days=30), "week": timedelta(weeks=12), "month": timedelta(days=365)}
+MAX_POINTS = 400
+
+
+def bucket_start(d, bucket):
+    """First day of the bucket holding date `d`: itself, its week's Monday or the 1st of its month."""
+    if isinstance(d, datetime):
+        d = d.date()
+    if bucket == "week":
+        return d - timedelta(days=d.weekday())
+    if bucket == "month":
+        return d.replace(day=1)
+    return d
+
+
+def next_bucket(d, bucket):
+    if bucket == "week":
+        return d + timedelta(weeks=1)
+    if bucket == "month":
+        return (d.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return d + timedelta(days=1)
+
+
+def _accumulate(facts):
+    """Fold session facts into {(entity, entity_id, bucket, period_start): counters}."""
+    session_ids = {s_id for s_id, _ in facts}
+    sessions = {
+        s_id: (group_id, start_time)
+        for s_id, group_id, start_time in db.session.query(Session.id, Session.group_id, Session.start_time)
+        .filter(Session.id.in_(session_ids))
+    } if session_ids else {}
+
+    totals = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for (s_id, u_id), f in facts.items():
+        group_id, start_time = sessions[s_id]
+        for bucket in BUCKETS:
+            start = bucket_start(start_time, bucket)
+            t = totals[("user", u_id, bucket, start)]
+            for k in COUNTERS:
+                t[k] += f[k]
+            g = totals[("group", group_id, bucket, start)]
+            for k in ("goals", "assists", "mvp_votes"):
+                g[k] += f[k]
+    # One game per session for the group, however many players it had
+    for s_id, (group_id, start_time) in sessions.items():
+        for bucket in BUCKETS:
+            totals[("group", group_id, bucket, bucket_start(start_time, bucket))]["games"] += 1
+    return totals
+
+
+def _rows(totals):
+    return [
+        {"entity": e, "entity_id": e_id, "bucket": b, "period_start": p, **t}
+        for (e, e_id, b, p), t in totals.items()
+    ]
+
+
+def _upsert(rows):
+    if not rows:
+        return
+    insert = upsert_insert()
+    stmt = insert(StatRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StatRollup.entity, StatRollup.entity_id, StatRollup.bucket, StatRollup.period_start],
+        set_={k: getattr(StatRollup, k) + getattr(stmt.excluded, k) for k in COUNTERS},
+    )
+    db.session.execute(stmt, rows)
+
+
+def apply_completed_session(session):
+    """Add one newly completed session to its players' and group's buckets.
+
+    Like leaderboard.apply_completed_session, votes are left to
+    apply_mvp_votes. Returns the ids of the players touched.
+    """
+    facts = _session_facts([session.id], votes=False)
+    _upsert(_rows(_accumulate(facts)))
+    return {u_id for _, u_id in facts}
+
+
+def apply_mvp_votes(session, counts):
+    """Count MVP votes cast after completion; `counts` is {voted_for_id: n}."""
+    if session.completed_at is None or not counts:
+        return
+    owners = [("user", u_id, n) for u_id, n in counts.items()] + [("group", session.group_id, sum(counts.values()))]
+    rows = [
+        {"entity": entity, "entity_id": e_id, "bucket": bucket, "period_start": bucket_start(session.start_time, bucket),
+         **dict.fromkeys(COUNTERS, 0), "mvp_votes": n}
+        for bucket in BUCKETS for entity, e_id, n in owners
+    ]
+    _upsert(rows)
+
+
+def rebuild_rollups():
+    """Recompute every rollup from completed sessions."""
+    rows = _rows(_accumulate(_session_facts()))
+    db.session.query(StatRollup).delete()
+    if rows:
+        db.session.execute(StatRollup.__table__.insert(), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def read_timeline(entity, entity_id, bucket, start, end):
+    """One point per bucket from `start` to `end` (dates, inclusive), empty buckets as zeros.
+
+    Reads at most one stored row per bucket — an index range scan.
+    """
+    first = bucket_start(start, bucket)
+    stored = {
+        r.period_start: r for r in
+        StatRollup.query.filter(
+            StatRollup.entity == entity,
+            StatRollup.entity_id == entity_id,
+            StatRollup.bucket == bucket,
+            StatRollup.period_start.between(first, end),
+        )
+    }
+    points = []
+    d = first
+    while d <= end:
+        r = stored.get(d)
+        points.append({"start": d.isoformat(), **{k: getattr(r, k) if r else 0 for k in FIELDS[entity]}})
+        d = next_bucket(d, bucket)
+    return points
+
+
+def count_points(start, end, bucket):
+    """How many buckets read_timeline would return, without building them."""
+    first = bucket_start(start, bucket)
+    if bucket == "month":
+        return (end.year - first.year) * 12 + end.month - first.month + 1
+    days = (end - first).days
+    return days // (7 if bucket == "week" else 1) + 1
@@ -0,0 +1,146 @@
+# scoreboard.py
+import threading
+import time
+from flask import current_app
+from sqlalchemy import func, update
+from db import db
+from models import SessionTeam, Goal
+
+
+def team_scores(session_id):
+    """[(team_id, name, goals)] for a session, from one grouped aggregate over its goals."""
+    return (
+        db.session.query(SessionTeam.id, SessionTeam.name, func.count(Goal.id))
+        .outerjoin(Goal, Goal.team_id == SessionTeam.id)
+        .filter(SessionTeam.session_id == session_id)
+        .group_by(SessionTeam.id, SessionTeam.name)
+        .order_by(SessionTeam.id)
+        .all()
+    )
+
+
+def winning_team(scores):
+    """Id of the team with the most goals, or None for a draw (or fewer than two teams)."""
+    ranked = sorted(scores, key=lambda t: t[2], reverse=True)
+    if len(ranked) > 1 and ranked[0][2] > ranked[1][2]:
+        return ranked[0][0]
+    return None
+
+
+def scoreboard_payload(session, scores, status):
+    total = sum(goals for _, _, goals in scores)
+    return {
+        "session_id": session.id,
+        "status": status,
+        "completed_at": session.completed_at.isoformat() if session.completed_at else None,
+        "teams": [
+            {"id": t_id, "name": name, "goals_for": goals, "goals_against": total - goals}
+            for t_id, name, goals in scores
+        ],
+        # While in play this is the team in front, not yet a winner
+        "winner_team_id" if status == "final" else "leading_team_id": winning_team(scores),
+    }
+
+
+def finalize_session(session):
+    """Store the final score of a session that has just been marked complete.
+
+    Team scores come from one grouped aggregate; goals_for/goals_against
+    are written to every team in one executemany, and the winner and the
+    full scoreboard are kept on the session so reading a finished game is
+    a single row lookup. Call inside the transaction that sets completed_at.
+    """
+    scores = team_scores(session.id)
+    total = sum(goals for _, _, goals in scores)
+    if scores:
+        db.session.execute(
+            update(SessionTeam),
+            [{"id": t_id, "goals_for": goals, "goals_against": total - goals} for t_id, _, goals in scores],
+        )
+    session.result = scoreboard_payload(session, scores, "final")
+    session.winner_team_id = session.result["winner_team_id"]
+    return session.result
+
+
+def stored_scoreboard(session):
+    """Scoreboard of a finished session, from its snapshot or the stored team columns."""
+    if session.result is not None:
+        return session.result
+    # Completed before scores were stored on completion
+    teams = (
+        db.session.query(SessionTeam.id, SessionTeam.name, SessionTeam.goals_for)
+        .filter(SessionTeam.session_id == session.id)
+        .order_by(SessionTeam.id)
+        .all()
+    )
+    return scoreboard_payload(session, [(t_id, name, goals or 0) for t_id, name, goals in teams], "final")
+
+
+class LiveScores:
+    """In-process goal tally for sessions still in play.
+
+    A session's tally is loaded with one aggregate on first read and then
+    moved along by the goal writes this process commits, so polling a live
+    scoreboard does not touch the goals table. Other workers' writes are
+    not seen here, so a tally is reloaded after SCOREBOARD_TTL seconds.
+    """
+
+    def __init__(self, app=None):
+        self._tallies = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("SCOREBOARD_TTL", 30)
+        self.ttl = app.config["SCOREBOARD_TTL"]
+        app.extensions["live_scores"] = self
+
+    def scoreboard(self, session):
+        with self._lock:
+            item = self._tallies.get(session.id)
+        if item is None or item[1] < time.monotonic():
+            scores = {t_id: [name, goals] for t_id, name, goals in team_scores(session.id)}
+            item = (scores, time.monotonic() + self.ttl)
+            with self._lock:
+                self._tallies[session.id] = item
+        with self._lock:
+            scores = [(t_id, name, goals) for t_id, (name, goals) in item[0].items()]
+        return scoreboard_payload(session, scores, "live")
+
+    def add_goals(self, session_id, team_counts):
+        """Apply committed goals, `team_counts` being {team_id: n}."""
+        with self._lock:
+            item = self._tallies.get(session_id)
+            if item is None:
+                return
+            scores = item[0]
+            if any(t_id not in scores for t_id in team_counts):
+                # A team this tally has not seen yet: reload on next read
+                del self._tallies[session_id]
+                return
+            for t_id, n in team_counts.items():
+                scores[t_id][1] += n
+
+    def discard(self, session_id):
+        with self._lock:
+            self._tallies.pop(session_id, None)
+
+
+def _live():
+    return current_app.extensions["live_scores"]
+
+
+def add_live_goals(session_id, team_counts):
+    _live().add_goals(session_id, team_counts)
+
+
+def discard_live_scores(session_id):
+    _live().discard(session_id)
+
+
+def session_scoreboard(session):
+    """Live tally while a session is in play, the stored result once it is complete."""
+    if session.completed_at is not None:
+        return stored_scoreboard(session)
+    return _live().scoreboard(session)
@@ -1,271 +1,214 @@
 # seed.py
-from datetime import datetime, timedelta, timezone
+"""Synthetic data generator.
+
+    python seed.py                                   # small demo dataset
+    python seed.py --users 100000 --groups 5000 --sessions-per-group 200
+
+Output is deterministic for a given --seed. Rows are built in Python with
+explicit ids and written with chunked Core executemany inserts in a single
+transaction, so millions of rows load in seconds. Goals never self-assist
+(ck_no_self_assist) and nobody votes for themselves (ck_no_self_vote).
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
 from app import create_app, db
 from models import (
     User, Group, GroupMembership,
     Session, SessionTeam, SessionTeamMembership,
     Goal, MvpVote
 )
-
-app = create_app()
-
-def add_members(group, names, users_cache):
-    """Create users if missing, add membership to group."""
-    memberships = []
-    # Sample attributes for users
-    user_attrs = {
-        "Khalid": {"fav_team": "Arsenal", "preferred_position": "FWD", "preferred_foot": "Right", "nickname": "Khal"},
-        "Mohamed": {"fav_team": "Chelsea", "preferred_position": "MID", "preferred_foot": "Left", "nickname": "Mo"},
-        "Mubarak": {"fav_team": "Liverpool", "preferred_position": "DEF", "preferred_foot": "Right", "nickname": "Mub"},
-        "Khadar": {"fav_team": "Manchester United", "preferred_position": "GK", "preferred_foot": "Both", "nickname": "Kad"},
-        "Abdi": {"fav_team": "Barcelona", "preferred_position": "FWD", "preferred_foot": "Left", "nickname": "Abd"},
-        "Yaya": {"fav_team": "Real Madrid", "preferred_position": "MID", "preferred_foot": "Right", "nickname": "Yay"},
-        "Ilyas": {"fav_team": "Bayern Munich", "preferred_position": "DEF", "preferred_foot": "Both", "nickname": "Ily"},
-        "Ismail": {"fav_team": "PSG", "preferred_position": "GK", "preferred_foot": "Right", "nickname": "Ism"},
-        "Malik": {"fav_team": "Juventus", "preferred_position": "FWD", "preferred_foot": "Left", "nickname": "Mal"},
-        "Hamsa": {"fav_team": "AC Milan", "preferred_position": "MID", "preferred_foot": "Right", "nickname": "Ham"},
-        "Yusuf": {"fav_team": "Inter Milan", "preferred_position": "DEF", "preferred_foot": "Both", "nickname": "Yus"},
-        "Sayid": {"fav_team": "Napoli", "preferred_position": "GK", "preferred_foot": "Left", "nickname": "Say"},
-        "Ahmed": {"fav_team": "Tottenham", "preferred_position": "FWD", "preferred_foot": "Right", "nickname": "Ahd"},
-        "Bilal": {"fav_team": "Leicester", "preferred_position": "MID", "preferred_foot": "Left", "nickname": "Bil"},
-        "Farah": {"fav_team": "Everton", "preferred_position": "DEF", "preferred_foot": "Both", "nickname": "Far"},
-        "Samir": {"fav_team": "West Ham", "preferred_position": "GK", "preferred_foot": "Right", "nickname": "Sam"},
-        "Omar": {"fav_team": "Newcastle", "preferred_position": "FWD", "preferred_foot": "Left", "nickname": "Oma"},
-        "Karim": {"fav_team": "Aston Villa", "preferred_position": "MID", "preferred_foot": "Right", "nickname": "Kar"},
-        "Taha": {"fav_team": "Wolves", "preferred_position": "DEF", "preferred_foot": "Both", "nickname": "Tah"},
-        "Zak": {"fav_team": "Southampton", "preferred_position": "GK", "preferred_foot": "Left", "nickname": "Zak"},
-    }
-    for n in names:
-        user = users_cache.get(n) or User.query.filter_by(name=n).first()
-        if not user:
-            attrs = user_attrs.get(n, {})
-            user = User(
-                name=n,
-                fav_team=attrs.get("fav_team"),
-                preferred_position=attrs.get("preferred_position"),
-                preferred_foot=attrs.get("preferred_foot"),
-                nickname=attrs.get("nickname"),
-                profile_pic=None,  # Keep as None for now
-            )
-            db.session.add(user)
-            db.session.flush()  # Flush new user
-            users_cache[n] = user
-        else:
-            db.session.flush()  # Flush existing user if needed
-        memberships.append(GroupMembership(user=user, group=group))
-    db.session.add_all(memberships)
-    return [m.user for m in memberships]
-
-with app.app_context():
-    db.drop_all()
-    db.create_all()
-
-    users_cache = {}
-
-    # --- Groups ---
-    g_hidden = Group(name="Hidden Leaf")
-    g_boys = Group(name="The Boys")
-    g_invinc = Group(name="Invincibles")
-    g_stranger = Group(name="Stranger Ballers")
-    g_diggers = Group(name="Goal Diggers")
-    db.session.add_all([g_hidden, g_boys, g_invinc, g_stranger, g_diggers])
-    db.session.flush()  # Flush to make groups in session
-
-    # Assign leaders (just first added member later)
-    # --- Members ---
-    hidden_players = add_members(g_hidden, ["Khalid", "Mohamed", "Mubarak", "Khadar"], users_cache)
-    boys_players = add_members(g_boys, ["Abdi", "Yaya", "Ilyas", "Ismail"], users_cache)
-    inv_players = add_members(g_invinc, ["Malik", "Hamsa", "Yusuf", "Sayid"], users_cache)
-    stranger_players = add_members(g_stranger, ["Ahmed", "Bilal", "Farah", "Samir"], users_cache)
-    digger_players = add_members(g_diggers, ["Omar", "Karim", "Taha", "Zak"], users_cache)
-    db.session.flush()  # Flush to make users in session
-
-    # Leaders = first member of each for now
-    g_hidden.leader_id = hidden_players[0].id
-    g_boys.leader_id = boys_players[0].id
-    g_invinc.leader_id = inv_players[0].id
-    g_stranger.leader_id = stranger_players[0].id
-    g_diggers.leader_id = digger_players[0].id
-    db.session.commit()
-
-    # --- Sessions (with location/time) ---
-    # Past sessions for more stats
-    s_hidden_past = Session(
-        group=g_hidden,
-        created_by=hidden_players[0],
-        host=hidden_players[0],  # Khalid
-        location="City Sports Hall",
-        start_time=datetime(2025, 8, 21, 18, 30),
-        completed_at=datetime(2025, 8, 21, 20, 30)  # Completed
-    )
-    s_boys_past = Session(
-        group=g_boys,
-        created_by=boys_players[1],
-        host=boys_players[1],    # Yaya
-        location="Riverside Pitch",
-        start_time=datetime(2025, 8, 25, 19, 0),
-        completed_at=datetime(2025, 8, 25, 21, 0)  # Completed
-    )
-
-    # Current sessions
-    s_hidden = Session(
-        group=g_hidden,
-        created_by=hidden_players[0],
-        host=hidden_players[0],  # Khalid
-        location="City Sports Hall",
-        start_time=datetime(2025, 8, 28, 18, 30)
-    )
-    s_boys = Session(
-        group=g_boys,
-        created_by=boys_players[1],
-        host=boys_players[1],    # Yaya
-        location="Riverside Pitch",
-        start_time=datetime(2025, 9, 1, 19, 0)
-    )
-    s_inv = Session(
-        group=g_invinc,
-        created_by=inv_players[0],
-        host=inv_players[0],     # Malik
-        location="Academy 5-a-side",
-        start_time=datetime(2025, 9, 5, 20, 0)
-    )
-    db.session.add_all([s_hidden_past, s_boys_past, s_hidden, s_boys, s_inv])
-    db.session.flush()  # Flush to make sessions in session
-
-    # --- Teams per session (flexible names) ---
-    # Past Hidden Leaf session teams
-    hl_past_team_a = SessionTeam(session=s_hidden_past, name="Team A", captain=hidden_players[0])  # Khalid
-    hl_past_team_b = SessionTeam(session=s_hidden_past, name="Team B", captain=hidden_players[1])  # Mohamed
-    db.session.add_all([hl_past_team_a, hl_past_team_b])
-    db.session.flush()
-    db.session.add_all([
-        SessionTeamMembership(session_team=hl_past_team_a, user=hidden_players[0]),  # Khalid
-        SessionTeamMembership(session_team=hl_past_team_a, user=hidden_players[2]),  # Mubarak
-        SessionTeamMembership(session_team=hl_past_team_b, user=hidden_players[1]),  # Mohamed
-        SessionTeamMembership(session_team=hl_past_team_b, user=hidden_players[3]),  # Khadar
-    ])
-
-    # Past The Boys session teams
-    boys_past_red = SessionTeam(session=s_boys_past, name="Red", captain=boys_players[0])   # Abdi
-    boys_past_blue = SessionTeam(session=s_boys_past, name="Blue", captain=boys_players[1]) # Yaya
-    db.session.add_all([boys_past_red, boys_past_blue])
-    db.session.flush()
-    db.session.add_all([
-        SessionTeamMembership(session_team=boys_past_red, user=boys_players[0]),   # Abdi
-        SessionTeamMembership(session_team=boys_past_red, user=boys_players[2]),   # Ilyas
-        SessionTeamMembership(session_team=boys_past_blue, user=boys_players[1]),  # Yaya
-        SessionTeamMembership(session_team=boys_past_blue, user=boys_players[3]),  # Ismail
-    ])
-
-    # Current Hidden Leaf session teams: Team A / Team B with captains
-    hl_team_a = SessionTeam(session=s_hidden, name="Team A", captain=hidden_players[0])  # Khalid
-    hl_team_b = SessionTeam(session=s_hidden, name="Team B", captain=hidden_players[1])  # Mohamed
-    db.session.add_all([hl_team_a, hl_team_b])
-    db.session.flush()
-
-    # Add members to teams
-    db.session.add_all([
-        SessionTeamMembership(session_team=hl_team_a, user=hidden_players[0]),  # Khalid
-        SessionTeamMembership(session_team=hl_team_a, user=hidden_players[2]),  # Mubarak
-        SessionTeamMembership(session_team=hl_team_b, user=hidden_players[1]),  # Mohamed
-        SessionTeamMembership(session_team=hl_team_b, user=hidden_players[3]),  # Khadar
-    ])
-
-    # The Boys: Red / Blue
-    boys_red = SessionTeam(session=s_boys, name="Red", captain=boys_players[0])   # Abdi
-    boys_blue = SessionTeam(session=s_boys, name="Blue", captain=boys_players[1]) # Yaya
-    db.session.add_all([boys_red, boys_blue])
-    db.session.flush()
-    db.session.add_all([
-        SessionTeamMembership(session_team=boys_red, user=boys_players[0]),   # Abdi
-        SessionTeamMembership(session_team=boys_red, user=boys_players[2]),   # Ilyas
-        SessionTeamMembership(session_team=boys_blue, user=boys_players[1]),  # Yaya
-        SessionTeamMembership(session_team=boys_blue, user=boys_players[3]),  # Ismail
-    ])
-
-    # Invincibles: Team X / Team Y
-    inv_x = SessionTeam(session=s_inv, name="Team X", captain=inv_players[0])  # Malik
-    inv_y = SessionTeam(session=s_inv, name="Team Y", captain=inv_players[2])  # Yusuf
-    db.session.add_all([inv_x, inv_y])
-    db.session.flush()
-    db.session.add_all([
-        SessionTeamMembership(session_team=inv_x, user=inv_players[0]),  # Malik
-        SessionTeamMembership(session_team=inv_x, user=inv_players[3]),  # Sayid
-        SessionTeamMembership(session_team=inv_y, user=inv_players[2]),  # Yusuf
-        SessionTeamMembership(session_team=inv_y, user=inv_players[1]),  # Hamsa
-    ])
-    db.session.flush()  # Flush to make teams and memberships in session
-
-    # --- Goals (example stats) ---
-    # Past Hidden Leaf session goals
-    db.session.add_all([
-        Goal(session=s_hidden_past, team=hl_past_team_a, scorer_id=hidden_players[0].id, assist_id=hidden_players[2].id),  # Khalid <- Mubarak
-        Goal(session=s_hidden_past, team=hl_past_team_b, scorer_id=hidden_players[1].id),                             # Mohamed (solo)
-        Goal(session=s_hidden_past, team=hl_past_team_a, scorer_id=hidden_players[2].id, assist_id=hidden_players[0].id), # Mubarak <- Khalid
-        Goal(session=s_hidden_past, team=hl_past_team_b, scorer_id=hidden_players[3].id),                             # Khadar
-    ])
-
-    # Past The Boys session goals
-    db.session.add_all([
-        Goal(session=s_boys_past, team=boys_past_red, scorer_id=boys_players[0].id, assist_id=boys_players[2].id),  # Abdi <- Ilyas
-        Goal(session=s_boys_past, team=boys_past_blue, scorer_id=boys_players[1].id),                          # Yaya (solo)
-        Goal(session=s_boys_past, team=boys_past_red, scorer_id=boys_players[2].id, assist_id=boys_players[0].id), # Ilyas <- Abdi
-        Goal(session=s_boys_past, team=boys_past_blue, scorer_id=boys_players[3].id, assist_id=boys_players[1].id), # Ismail <- Yaya
-    ])
-
-    # Current Hidden Leaf session goals
-    db.session.add_all([
-        Goal(session=s_hidden, team=hl_team_a, scorer_id=hidden_players[0].id, assist_id=hidden_players[2].id),  # Khalid <- Mubarak
-        Goal(session=s_hidden, team=hl_team_b, scorer_id=hidden_players[1].id),                             # Mohamed (solo)
-        Goal(session=s_hidden, team=hl_team_a, scorer_id=hidden_players[0].id),                             # Khalid
-    ])
-
-    # The Boys session goals
-    db.session.add_all([
-        Goal(session=s_boys, team=boys_red, scorer_id=boys_players[0].id, assist_id=boys_players[2].id),  # Abdi <- Ilyas
-        Goal(session=s_boys, team=boys_blue, scorer_id=boys_players[1].id, assist_id=boys_players[3].id), # Yaya <- Ismail
-        Goal(session=s_boys, team=boys_red, scorer_id=boys_players[2].id),                          # Ilyas
-    ])
-
-    # Invincibles session goals
-    db.session.add_all([
-        Goal(session=s_inv, team=inv_x, scorer_id=inv_players[0].id),           # Malik
-        Goal(session=s_inv, team=inv_y, scorer_id=inv_players[2].id),           # Yusuf
-        Goal(session=s_inv, team=inv_y, scorer_id=inv_players[1].id, assist_id=inv_players[2].id),  # Hamsa <- Yusuf
-    ])
-    db.session.flush()  # Flush to make goals in session
-
-    # --- Optionally finalize one session & simulate MVP votes ---
-    # Mark Hidden Leaf as completed now; open voting window (in real app you'd enforce the 3h window)
-    s_hidden.completed_at = datetime.now(timezone.utc)
-    db.session.commit()
-
-    # Past MVP votes
-    # Hidden Leaf past: Khalid, Mubarak, Mohamed, Khadar
-    db.session.add_all([
-        MvpVote(session=s_hidden_past, voter_id=hidden_players[0].id, voted_for_id=hidden_players[2].id),  # Khalid -> Mubarak
-        MvpVote(session=s_hidden_past, voter_id=hidden_players[1].id, voted_for_id=hidden_players[0].id),  # Mohamed -> Khalid
-        MvpVote(session=s_hidden_past, voter_id=hidden_players[2].id, voted_for_id=hidden_players[1].id),  # Mubarak -> Mohamed
-        MvpVote(session=s_hidden_past, voter_id=hidden_players[3].id, voted_for_id=hidden_players[0].id),  # Khadar -> Khalid
-    ])
-
-    # The Boys past: Abdi, Yaya, Ilyas, Ismail
-    db.session.add_all([
-        MvpVote(session=s_boys_past, voter_id=boys_players[0].id, voted_for_id=boys_players[1].id),  # Abdi -> Yaya
-        MvpVote(session=s_boys_past, voter_id=boys_players[1].id, voted_for_id=boys_players[2].id),  # Yaya -> Ilyas
-        MvpVote(session=s_boys_past, voter_id=boys_players[2].id, voted_for_id=boys_players[0].id),  # Ilyas -> Abdi
-        MvpVote(session=s_boys_past, voter_id=boys_players[3].id, voted_for_id=boys_players[1].id),  # Ismail -> Yaya
-    ])
-
-    # Current votes (no self-votes)
-    # Participants: Khalid, Mubarak, Mohamed, Khadar
-    db.session.add_all([
-        MvpVote(session=s_hidden, voter_id=hidden_players[0].id, voted_for_id=hidden_players[1].id),  # Khalid -> Mohamed
-        MvpVote(session=s_hidden, voter_id=hidden_players[1].id, voted_for_id=hidden_players[0].id),  # Mohamed -> Khalid
-        MvpVote(session=s_hidden, voter_id=hidden_players[2].id, voted_for_id=hidden_players[0].id),  # Mubarak -> Khalid
-        MvpVote(session=s_hidden, voter_id=hidden_players[3].id, voted_for_id=hidden_players[1].id),  # Khadar -> Mohamed
-    ])
-    db.session.flush()  # Flush MVP votes
-    db.session.commit()
-
-    print("✅ Seed complete: groups, users, sessions, teams, goals, MVP votes.")
+from stats import rebuild_user_stats
+from leaderboard import rebuild_leaderboards
+from mvp import rebuild_mvp
+from chemistry import rebuild_chemistry
+from ratings import rebuild_ratings
+from rollups import rebuild_rollups
+
+FIRST_NAMES = [
+    "Khalid", "Mohamed", "Mubarak", "Khadar", "Abdi", "Yaya", "Ilyas", "Ismail", "Malik", "Hamsa",
+    "Yusuf", "Sayid", "Ahmed", "Bilal", "Farah", "Samir", "Omar", "Karim", "Taha", "Zak",
+]
+FAV_TEAMS = [
+    "Arsenal", "Chelsea", "Liverpool", "Manchester United", "Barcelona", "Real Madrid", "Bayern Munich",
+    "PSG", "Juventus", "AC Milan", "Inter Milan", "Napoli", "Tottenham", "Leicester", "Everton",
+    "West Ham", "Newcastle", "Aston Villa", "Wolves", "Southampton",
+]
+POSITIONS = ["FWD", "MID", "DEF", "GK"]
+FEET = ["Right", "Left", "Both"]
+GROUP_WORDS = ["Hidden Leaf", "The Boys", "Invincibles", "Stranger Ballers", "Goal Diggers", "Sunday League", "Five-a-Side"]
+LOCATIONS = ["City Sports Hall", "Riverside Pitch", "Academy 5-a-side", "Park Astro", "Community Centre"]
+TEAM_NAMES = [("Team A", "Team B"), ("Red", "Blue"), ("Team X", "Team Y"), ("Bibs", "Skins")]
+
+FIRST_KICKOFF = datetime(2025, 1, 6, 19, 0)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fill the database with synthetic OffThePost data.")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--groups", type=int, default=5)
+    parser.add_argument("--sessions-per-group", type=int, default=3)
+    parser.add_argument("--members-per-group", type=int, default=12)
+    parser.add_argument("--players-per-team", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=20000)
+    return parser.parse_args()
+
+
+class ChunkedWriter:
+    """Buffers rows per table and writes them as executemany inserts.
+
+    Every flush writes all buffers parents-first, so foreign keys always
+    point at rows that are already in the database. On SQLite the rows go
+    straight to the driver's executemany, skipping per-row parameter
+    processing in SQLAlchemy.
+    """
+
+    def __init__(self, chunk_size):
+        self.chunk_size = chunk_size
+        self.buffers = {t: [] for t in db.metadata.sorted_tables}
+        self.counts = {}
+        self.raw_sqlite = db.session.get_bind().dialect.name == "sqlite"
+
+    def _insert(self, table, rows):
+        if not self.raw_sqlite:
+            db.session.execute(table.insert(), rows)
+            return
+        cols = list(rows[0])
+        sql = f"INSERT INTO {table.name} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+        params = [
+            tuple(v.isoformat(" ", "microseconds") if isinstance(v, datetime) else v for v in (r[c] for c in cols))
+            for r in rows
+        ]
+        db.session.connection().exec_driver_sql(sql, params)
+
+    def add(self, model, row):
+        buf = self.buffers[model.__table__]
+        buf.append(row)
+        if len(buf) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        for table, rows in self.buffers.items():
+            if rows:
+                self._insert(table, rows)
+                self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+                self.buffers[table] = []
+
+
+def generate(args):
+    rng = random.Random(args.seed)
+    out = ChunkedWriter(args.chunk_size)
+    members_per_group = min(args.members_per_group, args.users)
+
+    # --- Users ---
+    for uid in range(1, args.users + 1):
+        first = FIRST_NAMES[(uid - 1) % len(FIRST_NAMES)]
+        out.add(User, {
+            "id": uid,
+            "name": first if uid <= len(FIRST_NAMES) else f"{first} {uid}",
+            "fav_team": rng.choice(FAV_TEAMS),
+            "preferred_position": rng.choice(POSITIONS),
+            "preferred_foot": rng.choice(FEET),
+            "nickname": first[:3],
+            "profile_pic": None,
+        })
+    out.flush()
+
+    ids = {"session": 0, "team": 0, "membership": 0, "goal": 0, "vote": 0}
+
+    def next_id(kind):
+        ids[kind] += 1
+        return ids[kind]
+
+    for gid in range(1, args.groups + 1):
+        members = rng.sample(range(1, args.users + 1), members_per_group)
+        out.add(Group, {"id": gid, "name": f"{GROUP_WORDS[(gid - 1) % len(GROUP_WORDS)]} {gid}", "leader_id": members[0]})
+        for uid in members:
+            out.add(GroupMembership, {"user_id": uid, "group_id": gid, "joined_at": FIRST_KICKOFF})
+
+        # --- Weekly sessions; all but the latest are completed ---
+        first_kickoff = FIRST_KICKOFF + timedelta(hours=rng.randrange(0, 24 * 7))
+        team_names = TEAM_NAMES[(gid - 1) % len(TEAM_NAMES)]
+        location = rng.choice(LOCATIONS)
+        for week in range(args.sessions_per_group):
+            sid = next_id("session")
+            start = first_kickoff + timedelta(weeks=week)
+            completed = week < args.sessions_per_group - 1
+            completed_at = start + timedelta(hours=2) if completed else None
+
+            # --- Two teams from whoever turned up ---
+            turned_up = rng.sample(members, min(len(members), 2 * args.players_per_team))
+            half = len(turned_up) // 2
+            rosters = (turned_up[:half], turned_up[half:])
+            scores = [rng.randint(0, 8) if r else 0 for r in rosters]
+            tids = [next_id("team") for _ in rosters]
+            winner = None
+            if completed and scores[0] != scores[1]:
+                winner = tids[0] if scores[0] > scores[1] else tids[1]
+
+            out.add(Session, {
+                "id": sid, "group_id": gid, "created_by_id": members[0], "host_id": members[0],
+                "location": location, "start_time": start, "completed_at": completed_at,
+                "winner_team_id": winner, "result": None,
+            })
+            for side, (roster, name, tid) in enumerate(zip(rosters, team_names, tids)):
+                out.add(SessionTeam, {
+                    "id": tid, "session_id": sid, "name": name, "captain_id": roster[0] if roster else None,
+                    "goals_for": scores[side] if completed else 0,
+                    "goals_against": scores[1 - side] if completed else 0,
+                })
+                for uid in roster:
+                    out.add(SessionTeamMembership, {"id": next_id("membership"), "session_team_id": tid, "user_id": uid})
+
+                # --- Goals; assists come from a different teammate ---
+                for _ in range(scores[side]):
+                    scorer = rng.choice(roster)
+                    assist = None
+                    if len(roster) > 1 and rng.random() < 0.6:
+                        assist = rng.choice([u for u in roster if u != scorer])
+                    minute = rng.randint(1, 60)
+                    out.add(Goal, {
+                        "id": next_id("goal"), "session_id": sid, "team_id": tid, "scorer_id": scorer,
+                        "assist_id": assist, "minute": minute, "created_at": start + timedelta(minutes=minute),
+                    })
+
+            # --- MVP votes: each player votes once, never for themselves ---
+            if completed and len(turned_up) > 1:
+                for voter in turned_up:
+                    candidate = rng.choice(turned_up)
+                    while candidate == voter:
+                        candidate = rng.choice(turned_up)
+                    out.add(MvpVote, {
+                        "id": next_id("vote"), "session_id": sid, "voter_id": voter, "voted_for_id": candidate,
+                        "created_at": completed_at + timedelta(minutes=rng.randint(1, 170)),
+                    })
+
+    out.flush()
+    return out.counts
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    app = create_app()
+
+    with app.app_context():
+        started = time.perf_counter()
+        db.drop_all()
+        db.create_all()
+
+        counts = generate(args)
+        db.session.commit()
+
+        # MVP tallies/results, then the per-user counters and leaderboards built on them
+        rebuild_mvp()
+        rebuild_user_stats()
+        rebuild_leaderboards()
+        rebuild_chemistry()
+        rebuild_ratings()
+        rebuild_rollups()
+
+        elapsed = time.perf_counter() - started
+        summary = ", ".join(f"{n} {table}" for table, n in counts.items())
+        print(f"✅ Seed complete in {elapsed:.1f}s: {summary}")
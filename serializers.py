@@ -0,0 +1,180 @@
+# serializers.py
+import json
+from datetime import datetime
+from flask import abort, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from db import db
+from models import User, Group, Session, SessionTeam, Goal, MvpVote
+
+try:
+    import orjson
+except ImportError:  # optional fast path
+    orjson = None
+
+
+# --- JSON backend ---
+
+def dumps(obj):
+    """Compact JSON text, via orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"))
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, so jsonify skips the stdlib encoder."""
+
+    def _encode(self, obj):
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if self.sort_keys else 0)
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        return self._encode(obj).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._encode(obj), mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Use orjson for jsonify when it is installed; the stdlib encoder otherwise."""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+
+
+# --- Column-level schemas ---
+
+class Schema:
+    """The public fields of a resource, mapped to the columns that back them.
+
+    Queries select only the columns for the requested fields, labelled with
+    the field name, so rows come back as plain tuples rather than ORM
+    instances in the identity map. `joins` add a join only when a field
+    that needs it is requested. `computed` fields are filled in by the
+    route from other queries (e.g. user stats).
+    """
+
+    def __init__(self, model, columns, joins=None, computed=()):
+        self.model = model
+        self.columns = columns
+        self.joins = joins or {}
+        self.computed = tuple(computed)
+        self.fields = tuple(columns) + self.computed
+
+    def requested_fields(self, default=None):
+        """Fields from ?fields=a,b,c (otherwise `default`, or all), in schema order."""
+        raw = request.args.get("fields")
+        if not raw:
+            return tuple(default) if default else self.fields
+        wanted = {f.strip() for f in raw.split(",") if f.strip()}
+        unknown = wanted - set(self.fields)
+        if unknown:
+            abort(400, description=f"Unknown field(s): {', '.join(sorted(unknown))}. Available: {', '.join(self.fields)}")
+        return tuple(f for f in self.fields if f in wanted)
+
+    def _columns(self, fields):
+        # id is always selected: it is the keyset cursor and the stats key
+        names = ["id"] + [f for f in fields if f in self.columns and f != "id"]
+        return [self.columns[f].label(f) for f in names]
+
+    def _with_joins(self, stmt, fields):
+        for f in fields:
+            if f in self.joins:
+                stmt = self.joins[f](stmt)
+        return stmt
+
+    def query(self, fields):
+        """ORM Query of labelled row tuples (works with keyset_page / yield_per)."""
+        q = db.session.query(*self._columns(fields)).select_from(self.model)
+        return self._with_joins(q, fields)
+
+    def select(self, fields):
+        """The same statement as a Core select (for the async engine)."""
+        return self._with_joins(select(*self._columns(fields)).select_from(self.model), fields)
+
+    def to_dict(self, row, fields, extra=None):
+        out = {}
+        for f in fields:
+            v = extra[f] if f in self.computed else getattr(row, f)
+            out[f] = v.isoformat() if isinstance(v, datetime) else v
+        return out
+
+
+_leader = aliased(User)
+
+USER = Schema(
+    User,
+    {
+        "id": User.id,
+        "name": User.name,
+        "fav_team": User.fav_team,
+        "preferred_position": User.preferred_position,
+        "preferred_foot": User.preferred_foot,
+        "nickname": User.nickname,
+    },
+    computed=("goals_scored", "assists", "mvp_wins", "mvp_votes", "sessions_played", "teams_played"),
+)
+USER_COUNTER_FIELDS = {"goals_scored", "assists", "mvp_wins", "mvp_votes", "sessions_played"}
+
+GROUP = Schema(
+    Group,
+    {"id": Group.id, "name": Group.name, "leader": _leader.name},
+    joins={"leader": lambda q: q.outerjoin(_leader, _leader.id == Group.leader_id)},
+)
+
+SESSION = Schema(
+    Session,
+    {
+        "id": Session.id,
+        "group": Group.name,
+        "location": Session.location,
+        "start_time": Session.start_time,
+        "completed_at": Session.completed_at,
+    },
+    joins={"group": lambda q: q.join(Group, Group.id == Session.group_id)},
+)
+
+SESSION_TEAM = Schema(
+    SessionTeam,
+    {
+        "id": SessionTeam.id,
+        "session_id": SessionTeam.session_id,
+        "name": SessionTeam.name,
+        "captain_id": SessionTeam.captain_id,
+    },
+)
+
+GOAL = Schema(
+    Goal,
+    {
+        "id": Goal.id,
+        "session_id": Goal.session_id,
+        "team_id": Goal.team_id,
+        "scorer_id": Goal.scorer_id,
+        "assist_id": Goal.assist_id,
+        "minute": Goal.minute,
+    },
+)
+
+MVP_VOTE = Schema(
+    MvpVote,
+    {
+        "id": MvpVote.id,
+        "session_id": MvpVote.session_id,
+        "voter_id": MvpVote.voter_id,
+        "voted_for_id": MvpVote.voted_for_id,
+        "created_at": MvpVote.created_at,
+    },
+)
+
+
+def user_stats_needed(fields):
+    """(counters, teams): which of the two stats queries the requested fields need."""
+    return bool(USER_COUNTER_FIELDS & set(fields)), "teams_played" in fields
+
+
+def users_to_dicts(rows, fields, stats):
+    """USER rows plus their load_user_stats entries, as response dicts."""
+    return [USER.to_dict(r, fields, stats[r.id]) for r in rows]
@@ -0,0 +1,152 @@
+# stats.py
+from collections import defaultdict
+from sqlalchemy import func, select
+from db import db, upsert_insert
+from models import (
+    Group, Session, SessionTeam, SessionTeamMembership,
+    Goal, MvpVote, MvpResult, UserStats
+)
+
+STAT_FIELDS = ("goals", "assists", "mvp_votes_received", "mvp_wins", "sessions_played", "teams_played")
+
+
+def empty_user_stats(user_ids):
+    return {
+        uid: {"goals_scored": 0, "assists": 0, "mvp_wins": 0, "mvp_votes": 0, "sessions_played": 0, "teams_played": []}
+        for uid in user_ids
+    }
+
+
+def counters_select(user_ids):
+    return (
+        select(UserStats.user_id, UserStats.goals, UserStats.assists,
+               UserStats.mvp_wins, UserStats.mvp_votes_received, UserStats.sessions_played)
+        .where(UserStats.user_id.in_(user_ids))
+    )
+
+
+def team_labels_select(user_ids):
+    """Teams played, as (user_id, team name, group name), in one join instead of lazy loads."""
+    return (
+        select(SessionTeamMembership.user_id, SessionTeam.name, Group.name)
+        .join(SessionTeam, SessionTeam.id == SessionTeamMembership.session_team_id)
+        .join(Session, Session.id == SessionTeam.session_id)
+        .join(Group, Group.id == Session.group_id)
+        .where(SessionTeamMembership.user_id.in_(user_ids))
+        .order_by(SessionTeamMembership.user_id, SessionTeam.id)
+    )
+
+
+def merge_user_stats(stats, counter_rows, team_rows):
+    for uid, goals, assists, mvp_wins, mvp_votes, sessions_played in counter_rows:
+        s = stats[uid]
+        s["goals_scored"] = goals
+        s["assists"] = assists
+        s["mvp_wins"] = mvp_wins
+        s["mvp_votes"] = mvp_votes
+        s["sessions_played"] = sessions_played
+    for uid, team_name, group_name in team_rows:
+        stats[uid]["teams_played"].append(f"{team_name} ({group_name})")
+    return stats
+
+
+def load_user_stats(user_ids, counters=True, teams=True):
+    """Batch-load stats for many users in a fixed number of queries.
+
+    Counters come from the user_stats table (one keyed lookup); team labels
+    come from one join. Returns {user_id: {"goals_scored", "assists",
+    "mvp_wins", "mvp_votes", "sessions_played", "teams_played"}} for every id
+    passed in. Pass counters=False or teams=False to skip a query whose
+    fields the caller will not use.
+    """
+    user_ids = list(user_ids)
+    stats = empty_user_stats(user_ids)
+    if not user_ids:
+        return stats
+    return merge_user_stats(
+        stats,
+        db.session.execute(counters_select(user_ids)) if counters else (),
+        db.session.execute(team_labels_select(user_ids)) if teams else (),
+    )
+
+
+# --- Incremental maintenance (call inside the writing transaction) ---
+
+def bump_user_stats(user_id, **deltas):
+    """Add `deltas` (e.g. goals=1) to a user's counters, creating the row if needed."""
+    insert = upsert_insert()
+    values = {f: deltas.get(f, 0) for f in STAT_FIELDS}
+    stmt = insert(UserStats).values(user_id=user_id, **values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={f: getattr(UserStats, f) + stmt.excluded[f] for f in deltas},
+    )
+    db.session.execute(stmt)
+
+
+def bump_many_user_stats(deltas):
+    """bump_user_stats for many users, `deltas` being {user_id: {field: n}}, in one executemany."""
+    if not deltas:
+        return
+    insert = upsert_insert()
+    stmt = insert(UserStats)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={f: getattr(UserStats, f) + stmt.excluded[f] for f in STAT_FIELDS},
+    )
+    db.session.execute(stmt, [
+        {"user_id": u_id, **{f: d.get(f, 0) for f in STAT_FIELDS}} for u_id, d in deltas.items()
+    ])
+
+
+def record_goal(goal):
+    bump_user_stats(goal.scorer_id, goals=1)
+    if goal.assist_id is not None:
+        bump_user_stats(goal.assist_id, assists=1)
+
+
+def record_mvp_vote(vote):
+    bump_user_stats(vote.voted_for_id, mvp_votes_received=1)
+
+
+def record_team_membership(membership):
+    """Count a new team spot; sessions_played only moves on the first team in a session."""
+    team = db.session.get(SessionTeam, membership.session_team_id)
+    spots_in_session = (
+        db.session.query(func.count(SessionTeamMembership.id))
+        .join(SessionTeam, SessionTeam.id == SessionTeamMembership.session_team_id)
+        .filter(SessionTeam.session_id == team.session_id, SessionTeamMembership.user_id == membership.user_id)
+        .scalar()
+    )
+    bump_user_stats(membership.user_id, teams_played=1, sessions_played=1 if spots_in_session == 1 else 0)
+
+
+# --- Full rebuild ---
+
+def rebuild_user_stats():
+    """Recompute user_stats from goals, mvp_votes, mvp_results and team memberships."""
+    counts = defaultdict(lambda: dict.fromkeys(STAT_FIELDS, 0))
+
+    grouped = [
+        ("goals", db.session.query(Goal.scorer_id, func.count(Goal.id)).group_by(Goal.scorer_id)),
+        ("assists", db.session.query(Goal.assist_id, func.count(Goal.id))
+            .filter(Goal.assist_id.isnot(None)).group_by(Goal.assist_id)),
+        ("mvp_votes_received", db.session.query(MvpVote.voted_for_id, func.count(MvpVote.id))
+            .group_by(MvpVote.voted_for_id)),
+        ("mvp_wins", db.session.query(MvpResult.user_id, func.count()).group_by(MvpResult.user_id)),
+        ("teams_played", db.session.query(SessionTeamMembership.user_id, func.count(SessionTeamMembership.id))
+            .group_by(SessionTeamMembership.user_id)),
+        ("sessions_played", db.session.query(SessionTeamMembership.user_id, func.count(func.distinct(SessionTeam.session_id)))
+            .join(SessionTeam, SessionTeam.id == SessionTeamMembership.session_team_id)
+            .group_by(SessionTeamMembership.user_id)),
+    ]
+    for field, query in grouped:
+        for uid, n in query:
+            counts[uid][field] = n
+
+    db.session.query(UserStats).delete()
+    rows = [{"user_id": uid, **c} for uid, c in counts.items()]
+    if rows:
+        db.session.execute(UserStats.__table__.insert(), rows)
+    db.session.commit()
+    return len(rows)
@@ -0,0 +1,59 @@
+# streaming.py
+from flask import Response, abort, request, stream_with_context
+from serializers import dumps
+
+STREAM_BATCH_SIZE = 1000
+
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+
+def wants_stream():
+    """Requested stream format (?stream=ndjson|json), or None for a normal page."""
+    fmt = request.args.get("stream")
+    if fmt is None:
+        return None
+    if fmt not in STREAM_FORMATS:
+        abort(400, description=f"'stream' must be one of: {', '.join(STREAM_FORMATS)}")
+    return fmt
+
+
+def stream_query(query, id_column, to_dict, fmt):
+    """Stream every row of `query` as NDJSON or a chunked JSON array.
+
+    Rows are pulled from the cursor `STREAM_BATCH_SIZE` at a time via
+    yield_per, so memory stays flat however large the table is. ?cursor=
+    resumes an export after the last id seen.
+    """
+    cursor = request.args.get("cursor", type=int)
+    if cursor is not None:
+        query = query.filter(id_column > cursor)
+    rows = query.order_by(id_column).yield_per(STREAM_BATCH_SIZE)
+
+    def encoded():
+        # One chunk per batch rather than one tiny write per row
+        chunk = []
+        for row in rows:
+            chunk.append(dumps(to_dict(row)))
+            if len(chunk) >= STREAM_BATCH_SIZE:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def ndjson():
+        for chunk in encoded():
+            yield "\n".join(chunk) + "\n"
+
+    def json_array():
+        yield "["
+        sep = ""
+        for chunk in encoded():
+            yield sep + ",".join(chunk)
+            sep = ","
+        yield "]"
+
+    body = ndjson() if fmt == "ndjson" else json_array()
+    return Response(stream_with_context(body), mimetype=STREAM_FORMATS[fmt])
@@ -0,0 +1,152 @@
+# team_balance.py
+import numpy as np
+from sqlalchemy import and_
+from db import db
+from models import User, UserStats, LeaderboardEntry, SessionTeam, SessionTeamMembership
+from leaderboard import GLOBAL_SCOPE
+from stats import bump_many_user_stats
+
+# Strength = per-game output + how far the player's win rate is from 50%
+STRENGTH_WEIGHTS = {"goals": 1.0, "assists": 0.7, "mvp_wins": 1.5}
+WIN_RATE_WEIGHT = 2.0
+# A player with few games is pulled towards the squad average, as if they had
+# this many extra average games; newcomers rate exactly average
+PRIOR_GAMES = 5
+KEEPER = "GK"
+# Local search starts: the first from a greedy draft, the rest from shuffled drafts
+RESTARTS = 32
+
+
+def player_ratings(user_ids):
+    """[(user_id, name, position, rating)] for `user_ids` in one query, in the order given.
+
+    Raises LookupError naming any ids that are not users.
+    """
+    rows = {
+        r.id: r for r in
+        db.session.query(User.id, User.name, User.preferred_position, UserStats.mvp_wins,
+                         LeaderboardEntry.goals, LeaderboardEntry.assists, LeaderboardEntry.games, LeaderboardEntry.wins)
+        .outerjoin(UserStats, UserStats.user_id == User.id)
+        .outerjoin(LeaderboardEntry, and_(
+            LeaderboardEntry.user_id == User.id,
+            LeaderboardEntry.group_id == GLOBAL_SCOPE,
+            LeaderboardEntry.period == "all",
+        ))
+        .filter(User.id.in_(user_ids))
+    }
+    missing = [u for u in user_ids if u not in rows]
+    if missing:
+        raise LookupError(f"unknown users: {', '.join(map(str, missing))}")
+    rows = [rows[u] for u in user_ids]
+
+    def column(name):
+        return np.array([getattr(r, name) or 0 for r in rows], dtype=float)
+
+    games = column("games")
+    played = np.maximum(games, 1)
+    raw = sum(w * column(k) for k, w in STRENGTH_WEIGHTS.items()) / played
+    raw += WIN_RATE_WEIGHT * (column("wins") / played - 0.5)
+    mean = raw[games > 0].mean() if (games > 0).any() else 0.0
+    ratings = (games * raw + PRIOR_GAMES * mean) / (games + PRIOR_GAMES)
+    return [(r.id, r.name, r.preferred_position, float(x)) for r, x in zip(rows, ratings)]
+
+
+def _draft(ratings, keepers, n_teams, order):
+    """Greedy draft in `order`: keepers first, each pick to the weakest team short of players."""
+    team = np.empty(len(ratings), dtype=np.int64)
+    totals = np.zeros(n_teams)
+    sizes = np.zeros(n_teams, dtype=np.int64)
+    for in_class in (keepers, ~keepers):
+        class_sizes = np.zeros(n_teams, dtype=np.int64)
+        for i in order[in_class[order]]:
+            # Fewest of this class, then fewest players, then weakest
+            t = np.lexsort((totals, sizes, class_sizes))[0]
+            team[i] = t
+            totals[t] += ratings[i]
+            sizes[t] += 1
+            class_sizes[t] += 1
+    return team
+
+
+def _improve(ratings, swappable, team, n_teams):
+    """Steepest-descent pair swaps until no swap narrows the gaps between team totals.
+
+    Only swappable pairs (same position class, different teams) are tried, so
+    team sizes and keeper counts never change. Swapping i in team a with j in
+    team b moves d = r[j] - r[i] from b to a, changing the sum of squared
+    team totals by 2d(Ta - Tb) + 2d², which is evaluated for all pairs at once.
+    """
+    d = ratings[None, :] - ratings[:, None]
+    totals = np.bincount(team, weights=ratings, minlength=n_teams)
+    while True:
+        t = totals[team]
+        delta = 2 * d * (t[:, None] - t[None, :]) + 2 * d * d
+        delta[~swappable | (team[:, None] == team[None, :])] = np.inf
+        i, j = np.unravel_index(np.argmin(delta), delta.shape)
+        if delta[i, j] >= -1e-9:
+            return team
+        a, b = team[i], team[j]
+        totals[a] += d[i, j]
+        totals[b] -= d[i, j]
+        team[i], team[j] = b, a
+
+
+def balance_teams(ratings, keepers, n_teams, seed=0):
+    """Split players into `n_teams` of equal size (±1) with team rating totals as close as possible.
+
+    Keepers are spread first, so with at least `n_teams` of them every team
+    gets one. Returns each player's team index. Deterministic for a `seed`.
+    """
+    ratings = np.asarray(ratings, dtype=float)
+    keepers = np.asarray(keepers, dtype=bool)
+    swappable = keepers[:, None] == keepers[None, :]
+    rng = np.random.default_rng(seed)
+    best, best_cost = None, np.inf
+    for attempt in range(RESTARTS):
+        order = np.argsort(-ratings, kind="stable") if attempt == 0 else rng.permutation(len(ratings))
+        team = _improve(ratings, swappable, _draft(ratings, keepers, n_teams, order), n_teams)
+        totals = np.bincount(team, weights=ratings, minlength=n_teams)
+        cost = ((totals - totals.mean()) ** 2).sum()
+        if cost < best_cost - 1e-12:
+            best, best_cost = team.copy(), cost
+        if best_cost < 1e-9:
+            break
+    return best
+
+
+def auto_teams(session, user_ids, n_teams, names=None, create=True):
+    """Balance `user_ids` into `n_teams` for `session`; with create=False only propose.
+
+    Otherwise adds the SessionTeam rows and memberships to the caller's
+    transaction. Returns the teams in `names` order.
+    """
+    players = player_ratings(user_ids)
+    ratings = [p[3] for p in players]
+    keepers = [(p[2] or "").upper() == KEEPER for p in players]
+    team_of = balance_teams(ratings, keepers, n_teams, seed=session.id)
+
+    names = names or [f"Team {chr(ord('A') + t)}" for t in range(n_teams)]
+    teams = [{"id": None, "name": names[t], "rating": 0.0, "keepers": 0, "players": []} for t in range(n_teams)]
+    for (u_id, name, position, rating), t, keeper in zip(players, team_of, keepers):
+        team = teams[t]
+        team["players"].append({"user_id": u_id, "name": name, "position": position, "rating": round(rating, 3)})
+        team["rating"] += rating
+        team["keepers"] += keeper
+    for team in teams:
+        team["rating"] = round(team["rating"], 3)
+        team["players"].sort(key=lambda p: -p["rating"])
+
+    if create:
+        rows = [SessionTeam(session_id=session.id, name=team["name"]) for team in teams]
+        db.session.add_all(rows)
+        db.session.flush()
+        memberships = [
+            {"session_team_id": row.id, "user_id": p["user_id"]}
+            for row, team in zip(rows, teams) for p in team["players"]
+        ]
+        db.session.execute(SessionTeamMembership.__table__.insert(), memberships)
+        # A session's first team spot for everyone (the session had no teams)
+        bump_many_user_stats({m["user_id"]: {"teams_played": 1, "sessions_played": 1} for m in memberships})
+        for row, team in zip(rows, teams):
+            team["id"] = row.id
+    return teams
@@ -0,0 +1,68 @@
+import re
+import sys
+from sqlalchemy import func
+from app import create_app, db
+from models import (
+    Group, GroupMembership,
+    Session, SessionTeam, SessionTeamMembership,
+    Goal, MvpVote
+)
+
+# Throwaway in-memory schema built from the models (same indexes as the migrations)
+app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+
+
+def key_queries():
+    """(description, table that must not be full-scanned, query) for the real access paths."""
+    return [
+        ("goals scored by a player", "goals",
+            db.session.query(func.count(Goal.id)).filter(Goal.scorer_id == 1)),
+        ("assists by a player", "goals",
+            db.session.query(func.count(Goal.id)).filter(Goal.assist_id == 1)),
+        ("goals in a session by scorer", "goals",
+            db.session.query(Goal.scorer_id, func.count(Goal.id)).filter(Goal.session_id == 1).group_by(Goal.scorer_id)),
+        ("goals for a team", "goals",
+            db.session.query(func.count(Goal.id)).filter(Goal.team_id == 1)),
+        ("MVP votes received", "mvp_votes",
+            db.session.query(func.count(MvpVote.id)).filter(MvpVote.voted_for_id == 1)),
+        ("MVP votes in a session", "mvp_votes",
+            db.session.query(MvpVote.voted_for_id).filter(MvpVote.session_id == 1)),
+        ("teams a player played for", "session_team_memberships",
+            db.session.query(SessionTeam.name)
+            .join(SessionTeamMembership, SessionTeamMembership.session_team_id == SessionTeam.id)
+            .filter(SessionTeamMembership.user_id == 1)),
+        ("roster of a team", "session_team_memberships",
+            db.session.query(SessionTeamMembership.user_id).filter(SessionTeamMembership.session_team_id == 1)),
+        ("teams in a session", "session_teams",
+            db.session.query(SessionTeam.id).filter(SessionTeam.session_id == 1)),
+        ("recent sessions of a group", "sessions",
+            db.session.query(Session.id).filter(Session.group_id == 1).order_by(Session.start_time.desc()).limit(5)),
+        ("members of a group", "group_memberships",
+            db.session.query(GroupMembership.user_id).filter(GroupMembership.group_id == 1)),
+        ("groups a player belongs to", "group_memberships",
+            db.session.query(Group.name).join(GroupMembership).filter(GroupMembership.user_id == 1)),
+    ]
+
+
+def verify_indexes():
+    with app.app_context():
+        db.create_all()
+        print("🔍 Checking query plans...")
+        failures = 0
+        for description, table, query in key_queries():
+            sql = str(query.statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+            plan = [row[-1] for row in db.session.execute(db.text(f"EXPLAIN QUERY PLAN {sql}"))]
+            # "SCAN goals" (no USING ... INDEX) is a full table scan
+            scanned = any(re.fullmatch(rf"SCAN {table}( AS \w+)?", step) for step in plan)
+            print(f"  {'❌' if scanned else '✅'} {description}: {' | '.join(plan)}")
+            failures += scanned
+
+        if failures:
+            print(f"\n❌ {failures} key queries fall back to a full table scan")
+            return False
+        print("\n✅ All key queries use an index")
+        return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_indexes() else 1)
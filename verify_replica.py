@@ -0,0 +1,103 @@
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from app import create_app, db
+from db import REPLICA_BIND
+from models import User, Group, Session, SessionTeam, SessionTeamMembership, MvpTally, MvpResult, UserStats
+import mvp
+
+# Two SQLite files: the primary, and a replica copied from it before the
+# latest writes, so it lags the way a streaming replica can
+tmp = tempfile.mkdtemp(prefix="otp-replica-")
+PRIMARY = os.path.join(tmp, "primary.db")
+REPLICA = os.path.join(tmp, "replica.db")
+
+app = create_app({
+    "SQLALCHEMY_DATABASE_URI": f"sqlite:///{PRIMARY}",
+    "SQLALCHEMY_REPLICA_URI": f"sqlite:///{REPLICA}",
+    "CACHE_BACKEND": "none",
+    "JOB_WORKERS": 0,
+})
+
+
+def build():
+    """Primary with one session whose voting window closed; the replica copied before it is finalized."""
+    with app.app_context():
+        db.create_all(bind_key=None)
+        players = [User(name=f"replica-{i}") for i in range(4)]
+        group = Group(name="replica")
+        db.session.add_all(players + [group])
+        db.session.flush()
+        session = Session(group_id=group.id, start_time=datetime.utcnow() - timedelta(hours=6),
+                          completed_at=datetime.utcnow() - timedelta(hours=5))
+        db.session.add(session)
+        db.session.flush()
+        team = SessionTeam(session_id=session.id, name="A")
+        db.session.add(team)
+        db.session.flush()
+        db.session.add_all(SessionTeamMembership(session_team_id=team.id, user_id=u.id) for u in players)
+        db.session.add(MvpTally(session_id=session.id, user_id=players[0].id, votes=3))
+        db.session.commit()
+        ids = session.id, players[0].id
+        db.session.execute(db.text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        for engine in db.engines.values():
+            engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(REPLICA + suffix):
+            os.remove(REPLICA + suffix)
+    shutil.copy(PRIMARY, REPLICA)
+
+    with app.app_context():
+        # Only the primary sees the finalization and a new user
+        mvp.finalize_due_sessions()
+        db.session.add(User(name="primary-only"))
+        db.session.commit()
+    return ids
+
+
+def verify_replica():
+    session_id, winner_id = build()
+    client = app.test_client()
+    failures = 0
+
+    def check(description, ok):
+        nonlocal failures
+        print(f"  {'✅' if ok else '❌'} {description}")
+        failures += not ok
+
+    print("🔍 Checking read routing against a lagging replica...")
+    search = client.get("/users?limit=100").get_json()
+    check("GET reads come from the replica", all(u["name"] != "primary-only" for u in search["items"]))
+
+    created = client.post("/users", json={"name": "written"})
+    check("POST writes go to the primary", created.status_code == 201)
+
+    response = client.get(f"/sessions/{session_id}/mvp")
+    body = response.get_json() or {}
+    check(f"GET /sessions/{session_id}/mvp on a stale replica returns 200 ({response.status_code})",
+          response.status_code == 200)
+    check("it reports the primary's final result", body.get("status") == "final"
+          and [w["user_id"] for w in body.get("winners", [])] == [winner_id])
+
+    with app.app_context():
+        results = db.session.query(MvpResult).filter_by(session_id=session_id).count()
+        wins = db.session.get(UserStats, winner_id).mvp_wins
+        replica_finalized = db.session.execute(
+            db.select(Session.mvp_finalized_at).where(Session.id == session_id),
+            bind_arguments={"bind": db.engines[REPLICA_BIND]},
+        ).scalar()
+    check("the session was finalized exactly once", results == 1 and wins == 1)
+    check("the replica was still lagging", replica_finalized is None)
+
+    shutil.rmtree(tmp, ignore_errors=True)
+    if failures:
+        print(f"\n❌ {failures} replica checks failed")
+        return False
+    print("\n✅ Reads use the replica and GET handlers that write decide on the primary")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_replica() else 1)